@@ -2,43 +2,89 @@ from treys import Card
 
 from agents.Player import Player
 from game.Action import Action
-from util.montecarlo import Evaluation
+from util.montecarlo import Evaluation, EXACT_THRESHOLD, batch_equity
+from util.EquityCache import EquityCache
 
 
 class EquityPlayer(Player):
-    def __init__(self, uuid, iters=10000, mbe=0.3, mce=0.2):
+    cache = EquityCache()  # Shared by every player in the process unless one is given
+    increment1 = .1
+    increment2 = .2
+
+    def __init__(self, uuid, iters=10000, mbe=0.3, mce=0.2, cache=None):
         super(EquityPlayer, self).__init__(uuid)
+        if cache is not None:
+            self.cache = cache
         self.iters = iters
         self.min_bet_equity = mbe
         self.min_call_equity = mce
 
     @staticmethod
-    def eval_hand(cards, hole_cards, n_players, iters=10000):
+    def to_numeric(card):
         """
-        Translate alpha numerica cards to numeric and run montecarlo
+        Translate a treys card to the [rank, suit] of util.montecarlo
         """
         CARD_RANKS_ORIGINAL = '23456789TJQKA'
-        SUITS_ORIGINAL = 'CDHS'
+        SUITS_ORIGINAL = 'cdhs'
+        c_str = Card.int_to_str(card)
+        return [CARD_RANKS_ORIGINAL.find(c_str[0]) + 2, SUITS_ORIGINAL.find(c_str[1])]
+
+    @staticmethod
+    def eval_hand(cards, hole_cards, n_players, iters=10000, exact_threshold=EXACT_THRESHOLD):
+        """
+        Translate alpha numerica cards to numeric and run montecarlo, or enumerate every
+        runout and opponent holding when there are at most exact_threshold of them
+        """
         evaluator = Evaluation()
-        c_str = Card.int_to_str(cards[0])
-        card1 = [CARD_RANKS_ORIGINAL.find(c_str[0]), SUITS_ORIGINAL.find(c_str[1])]
-        c_str = Card.int_to_str(cards[1])
-        card2 = [CARD_RANKS_ORIGINAL.find(c_str[0]), SUITS_ORIGINAL.find(c_str[1])]
+        table_cards_numeric = [EquityPlayer.to_numeric(table_card) for table_card in hole_cards]
+        equity = evaluator.run_evaluation(card1=EquityPlayer.to_numeric(cards[0]),
+                                          card2=EquityPlayer.to_numeric(cards[1]),
+                                          tablecards=table_cards_numeric, iterations=iters,
+                                          player_amount=n_players, exact_threshold=exact_threshold)
+
+        return equity
 
-        table_cards_numeric = []
-        for table_card in hole_cards:
-            c_str = Card.int_to_str(table_card)
-            table_cards_numeric.append([CARD_RANKS_ORIGINAL.find(c_str[0]), SUITS_ORIGINAL.find(c_str[1])])
+    @staticmethod
+    def eval_hands(spots, iters=1000):
+        """
+        Equity of many spots at once, see util.montecarlo.batch_equity
+        :param spots: List of (hole cards, board, number of players) with treys cards
+        :return: Array of equities in the order of spots
+        """
+        return batch_equity([[EquityPlayer.to_numeric(card) for card in cards] for cards, _, _ in spots],
+                            [[EquityPlayer.to_numeric(card) for card in board] for _, board, _ in spots],
+                            [n_players - 1 for _, _, n_players in spots], iterations=iters)
 
-        equity = evaluator.run_evaluation(card1=card1, card2=card2, tablecards=table_cards_numeric,
-                                               iterations=iters, player_amount=n_players)
+    @staticmethod
+    def estimate_hand(cards, board, n_players, iters=10000, thresholds=()):
+        """
+        Sample only until the equity is known to lie between two thresholds, see Evaluation.run_adaptive
+        :return: util.montecarlo.EquityEstimate
+        """
+        return Evaluation().run_adaptive(card1=EquityPlayer.to_numeric(cards[0]),
+                                         card2=EquityPlayer.to_numeric(cards[1]),
+                                         tablecards=[EquityPlayer.to_numeric(card) for card in board],
+                                         player_amount=n_players, thresholds=thresholds, max_samples=iters)
 
-        return equity
+    def thresholds(self, actions_avail):
+        """
+        Equities at which act changes its decision between the available actions
+        """
+        thresholds = {Action.ALLIN: self.min_bet_equity + self.increment2,
+                      Action.BET5BB: self.min_bet_equity + self.increment1,
+                      Action.BET3BB: self.min_bet_equity,
+                      Action.BET1BB: self.min_bet_equity - self.increment1,
+                      Action.CALL: self.min_call_equity}
+        return tuple(thresholds[action] for action in thresholds if action in actions_avail)
 
     def act(self, game_state, actions_avail):
-        equity_alive = self.eval_hand(self.cards, game_state["board"], len(game_state["history"]))
-        increment1 = .1
-        increment2 = .2
+        thresholds = self.thresholds(actions_avail)
+        if not thresholds:  # Nothing to bet or call, the equity cannot change the decision
+            return Action.CHECK if Action.CHECK in actions_avail else Action.FOLD
+        equity_alive = self.cache.get(self.cards, game_state["board"], len(game_state["history"]), self.iters,
+                                      self.estimate_hand, thresholds).equity
+        increment1 = self.increment1
+        increment2 = self.increment2
 
         if equity_alive > self.min_bet_equity + increment2 and Action.ALLIN in actions_avail:
             action = Action.ALLIN
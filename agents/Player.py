@@ -1,4 +1,6 @@
 from abc import ABC, abstractmethod
+import numpy as np
+from game.InfoSet import ACTIONS_BY_ID, InfoSetEncoder
 
 
 class Player(ABC):
@@ -24,3 +26,34 @@ class Player(ABC):
     @abstractmethod
     def act(self, game_state, actions_avail):
         pass
+
+    @staticmethod
+    def seat_history(encoder, history_id):
+        """
+        History of a hand in the form Poker passes to act, keyed by seat instead of uuid.
+        The id does not record the chips of each action so the amounts are None.
+        :return: {seat: [(action, None)]} with an entry for every seat at the table
+        """
+        history = {seat: [] for seat in range(encoder.n_seats)}
+        for seat, action in encoder.actions(history_id):
+            history[seat].append((action, None))
+        return history
+
+    def act_batch(self, states, legal_mask):
+        """
+        Actions at many tables of game.BatchPoker, players with vectorised policies override this
+        :param states: Dictionary of arrays with one row per table, see BatchPoker.states
+        :param legal_mask: [n, N_ACTION_IDS] actions available at each table
+        :return: [n] action ids
+        """
+        actions = np.empty(len(legal_mask), dtype=np.int64)
+        encoder = InfoSetEncoder(states["bets"].shape[1])
+        for i, legal in enumerate(legal_mask):
+            self.cards = states["cards"][i].tolist()
+            game_state = {"board": states["board"][i, :states["n_board"][i]].tolist(),
+                          "history": Player.seat_history(encoder, int(states["history_id"][i])),
+                          "position": int(states["seat"][i]),
+                          "history_id": int(states["history_id"][i]),
+                          "seat": int(states["seat"][i])}
+            actions[i] = self.act(game_state, [ACTIONS_BY_ID[a] for a in np.flatnonzero(legal)]).id
+        return actions
@@ -1,4 +1,5 @@
 import random
+import numpy as np
 from agents.Player import Player
 
 
@@ -8,3 +9,8 @@ class RandomPlayer(Player):
 
     def act(self, game_state, actions_avail):
         return random.choice(actions_avail)
+
+    def act_batch(self, states, legal_mask):
+        # Uniform index among the legal actions of each table
+        choice = (np.random.random(len(legal_mask)) * legal_mask.sum(axis=1)).astype(np.int64)
+        return (np.cumsum(legal_mask, axis=1) > choice[:, None]).argmax(axis=1)
@@ -0,0 +1,71 @@
+import os
+import random
+
+import numpy as np
+
+from agents.Player import Player
+from game.InfoSet import hand_class, hand_classes
+
+
+def index_path(path):
+    """
+    File holding the (history id, seat) of each row of a strategy file
+    """
+    return os.path.splitext(path)[0] + '.index.npy'
+
+
+def save_strategy(path, strategy, index):
+    """
+    Write a packed strategy as written by GameWrapper.export_strategy
+    :param strategy: [n, 169, N_ACTION_IDS] float32 probability of each action id per hand class
+    :param index: [n, 2] history id and seat of each row
+    """
+    np.save(path, np.ascontiguousarray(strategy, dtype=np.float32))
+    np.save(index_path(path), np.asarray(index, dtype=np.int64).reshape(-1, 2))
+
+
+class StrategyPlayer(Player):
+    """
+    Plays a strategy trained by GameWrapper. The strategy file is memory-mapped so every
+    process playing from it shares the same pages instead of loading a copy.
+    Information sets missing from the file, e.g. after the flop, are played uniformly.
+    """
+    def __init__(self, uuid, path):
+        """
+        :param path: .npy file written by GameWrapper.export_strategy
+        """
+        super(StrategyPlayer, self).__init__(uuid)
+        self.strategy = np.load(path, mmap_mode='r')
+        self.rows = {(history_id, seat): row
+                     for row, (history_id, seat) in enumerate(np.load(index_path(path)).tolist())}
+
+    def policy(self, game_state, actions_avail):
+        """
+        :return: Probability of each available action, None if the information set is unknown
+        """
+        row = self.rows.get((game_state["history_id"], game_state["seat"]))
+        if row is None:
+            return None
+        probabilities = self.strategy[row, hand_class(self.cards)]
+        weights = [float(probabilities[action.id]) for action in actions_avail]
+        total = sum(weights)
+        return [weight / total for weight in weights] if total > 0 else None
+
+    def act(self, game_state, actions_avail):
+        weights = self.policy(game_state, actions_avail)
+        if weights is None:
+            return random.choice(actions_avail)
+        return random.choices(actions_avail, weights)[0]
+
+    def act_batch(self, states, legal_mask):
+        rows = np.array([self.rows.get((int(history_id), int(seat)), -1)
+                         for history_id, seat in zip(states["history_id"], states["seat"])], dtype=np.int64)
+        weights = legal_mask.astype(np.float64)
+        known = np.flatnonzero(rows >= 0)
+        weights[known] *= self.strategy[rows[known], hand_classes(states["cards"][known])]
+        unknown = weights.sum(axis=1) <= 0
+        weights[unknown] = legal_mask[unknown]  # Played uniformly, as in act
+
+        cumulative = np.cumsum(weights, axis=1)
+        choice = np.random.random(len(legal_mask)) * cumulative[:, -1]
+        return (cumulative > choice[:, None]).argmax(axis=1)
@@ -0,0 +1,52 @@
+import random
+import time
+import numpy as np
+from treys import Deck
+from agents.EquityPlayer import EquityPlayer
+from util.montecarlo import Evaluation, batch_equity
+
+
+def random_spots(n):
+    """
+    Hole cards, a preflop, flop, turn or river board and one to three opponents as [rank, suit]
+    """
+    cards = [[rank, suit] for rank in range(2, 15) for suit in range(4)]
+    spots = []
+    for _ in range(n):
+        dealt = random.sample(cards, 7)
+        spots.append((dealt[:2], dealt[2:2 + random.choice([0, 3, 4, 5])], random.randint(1, 3)))
+    return spots
+
+
+def queries_per_second(spots, iterations):
+    """
+    :return: Queries per second of batch_equity and of one run_evaluation per query
+    """
+    start = time.perf_counter()
+    batch_equity([hole for hole, _, _ in spots], [board for _, board, _ in spots],
+                 [opponents for _, _, opponents in spots], iterations=iterations)
+    batch = len(spots) / (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    for hole, board, opponents in spots:
+        Evaluation().run_evaluation(hole[0], hole[1], board, iterations, opponents + 1, exact_threshold=-1)
+    return batch, len(spots) / (time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    random.seed(0)
+    np.random.seed(0)
+    batch_equity([[[14, 0], [14, 1]]], [[]], [1], iterations=10)  # Build the evaluator's tables first
+    for iterations in [100, 1000]:
+        print("%i iterations per query: batch %.0f queries/sec, one at a time %.0f queries/sec"
+              % ((iterations,) + queries_per_second(random_spots(200), iterations)))
+
+    spots = random_spots(5)
+    batch = batch_equity([hole for hole, _, _ in spots], [board for _, board, _ in spots],
+                         [opponents for _, _, opponents in spots], iterations=100000)
+    single = [Evaluation().run_evaluation(hole[0], hole[1], board, 100000, opponents + 1, exact_threshold=-1)
+              for hole, board, opponents in spots]
+    print("largest difference to run_evaluation over 100000 deals: %.4f" % np.abs(batch - single).max())
+
+    deck = Deck.GetFullDeck()
+    print("EquityPlayer.eval_hands:", EquityPlayer.eval_hands([(deck[:2], deck[2:5], 2), (deck[5:7], [], 3)]))
@@ -0,0 +1,26 @@
+import time
+from agents.RandomPlayer import RandomPlayer
+from game.BatchPoker import BatchPoker
+from game.Poker import Poker
+
+
+def hands_per_second(n_players=6, hands=20000, n_tables=10000):
+    players = [RandomPlayer(i + 1) for i in range(n_players)]
+    game = Poker(players, 10, 1000)
+    start = time.perf_counter()
+    for _ in range(hands // 10):
+        for player in game.players:
+            player.add_stack(1000 - player.stack)
+        game.play_round()
+        game.board = []
+    scalar = hands // 10 / (time.perf_counter() - start)
+
+    batch = BatchPoker(players, 10, n_tables)
+    start = time.perf_counter()
+    for _ in range(hands // n_tables):
+        batch.play_round(1000)
+    return scalar, hands // n_tables * n_tables / (time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    print("6 random players, hands/sec: Poker %.0f, BatchPoker %.0f" % hands_per_second())
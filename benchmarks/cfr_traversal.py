@@ -0,0 +1,51 @@
+import random
+import time
+from game.GameWrapper import GameWrapper
+from game.GameState import GameState
+
+
+def walk_copy(game, actions):
+    """Visit every node of the betting tree by copying the game for each action"""
+    if game.player_list.visited_all():
+        return 1
+    nodes = 1
+    for action in actions:
+        next_game = game.copy()
+        next_actions = next_game.step_bets([x for x in actions], action)
+        nodes += walk_copy(next_game, next_actions)
+    return nodes
+
+
+def walk_state(state):
+    """Visit every node of the betting tree by making and unmaking actions"""
+    if state.is_terminal():
+        return 1
+    nodes = 1
+    for action in state.actions:
+        state.apply(action)
+        nodes += walk_state(state)
+        state.undo()
+    return nodes
+
+
+def nodes_per_second(walk, hands, seed=0):
+    random.seed(seed)
+    wrapper = GameWrapper()
+    nodes = 0
+    elapsed = 0.0
+    for _ in range(hands):
+        game = wrapper.game.copy()
+        actions = wrapper.start_game(game)
+        start = time.perf_counter()
+        nodes += walk(game, actions)
+        elapsed += time.perf_counter() - start
+    return nodes / elapsed
+
+
+if __name__ == "__main__":
+    hands = 2000
+    before = nodes_per_second(walk_copy, hands)
+    after = nodes_per_second(lambda game, actions: walk_state(GameState(game, actions)), hands)
+    print("Poker.copy:         %10.0f nodes/sec" % before)
+    print("GameState.apply:    %10.0f nodes/sec" % after)
+    print("Speedup:            %10.1fx" % (after / before))
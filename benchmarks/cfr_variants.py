@@ -0,0 +1,51 @@
+import random
+from game.GameWrapper import GameWrapper
+from util.VectorCFR import VectorCFR
+from util.algorithms import VanillaCFR
+from util.exploitability import PreflopBestResponse
+from util.update_rules import UPDATE_RULES, get_update_rule
+from benchmarks.kuhn import KuhnNode
+
+
+def preflop_iterations(rule, target, max_iterations, check=10):
+    """
+    Iterations of vector CFR until the preflop average strategy is exploitable by less than target mbb/hand
+    """
+    wrapper = GameWrapper()
+    solver = VectorCFR(wrapper)
+    best_response = PreflopBestResponse(wrapper)
+    rule = get_update_rule(rule)
+    for i in range(1, max_iterations + 1):
+        solver.iterate(rule)
+        if i % check == 0 and best_response.exploitability() < target:
+            return i
+    return None
+
+
+def sampled_exploitability(rule, iterations=8000, seed=0):
+    """
+    Exploitability in mbb/hand of the preflop average strategy after chance sampled training
+    """
+    random.seed(seed)
+    wrapper = GameWrapper()
+    wrapper.train(iterations, print_interval=10 ** 9, update_rule=rule, plot_path=None)
+    return wrapper.exploitability()
+
+
+def kuhn_iterations(rule, target, max_iterations):
+    """
+    Iterations of vanilla CFR until Kuhn poker is exploitable by less than target chips per hand
+    """
+    cfr = VanillaCFR(KuhnNode(), update_rule=rule)
+    for i in range(1, max_iterations + 1):
+        cfr.run(1)
+        if cfr.exploitability() < target:
+            return i
+    return None
+
+
+if __name__ == "__main__":
+    print("%-8s %22s %22s %26s" % ("rule", "preflop (<25 mbb/hand)", "kuhn (<0.005)", "sampled 8000 (mbb/hand)"))
+    for name in UPDATE_RULES:
+        print("%-8s %22s %22s %26.1f" % (name, preflop_iterations(name, 25, 2000), kuhn_iterations(name, 0.005, 5000),
+                                         sampled_exploitability(name)))
@@ -0,0 +1,58 @@
+import random
+import time
+import numpy as np
+from treys import Card, Deck, Evaluator
+from util.evaluator import evaluate
+from util.montecarlo import Evaluation
+
+SUIT_INDEX = {1: 0, 2: 1, 4: 2, 8: 3}  # treys suit bit to suit index
+
+
+def random_hands(n_hands, n_cards, suits=4):
+    """
+    Random hands drawn from the cards of the first few suits, few suits make flushes common
+    """
+    deck = [card for card in Deck.GetFullDeck() if SUIT_INDEX[Card.get_suit_int(card)] < suits]
+    return [random.sample(deck, n_cards) for _ in range(n_hands)]
+
+
+def mismatches(hands):
+    """
+    Number of hands ranked differently by util.evaluator and treys
+    """
+    ranks = np.array([[Card.get_rank_int(card) for card in hand] for hand in hands])
+    suits = np.array([[SUIT_INDEX[Card.get_suit_int(card)] for card in hand] for hand in hands])
+    evaluator = Evaluator()
+    expected = np.array([evaluator.evaluate(hand[:2], hand[2:]) for hand in hands])
+    return int((evaluate(ranks, suits) != expected).sum())
+
+
+def hands_per_second(n_hands=100000):
+    cards = np.argsort(np.random.random((n_hands, 52)), axis=1)[:, :7]
+    ranks, suits = cards // 4, cards % 4
+    evaluate(ranks[:10], suits[:10])  # Build the tables first
+    start = time.perf_counter()
+    evaluate(ranks, suits)
+    vectorised = n_hands / (time.perf_counter() - start)
+
+    hands, evaluator = random_hands(10000, 7), Evaluator()
+    start = time.perf_counter()
+    for hand in hands:
+        evaluator.evaluate(hand[:2], hand[2:])
+    return vectorised, len(hands) / (time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    random.seed(0)
+    np.random.seed(0)
+    for n_cards in range(5, 8):
+        for suits in [4, 2, 1]:
+            print("%i cards from %i suits: %i mismatches with treys"
+                  % (n_cards, suits, mismatches(random_hands(20000, n_cards, suits))))
+    print("7 card hands/sec: lookup tables %.0f, treys %.0f" % hands_per_second())
+
+    start = time.perf_counter()
+    equity = Evaluation().run_evaluation(card1=[14, 0], card2=[14, 1], tablecards=[], iterations=10000,
+                                         player_amount=2)
+    print("run_evaluation of AA against one player, 10000 iterations: %.1f ms (wins %.3f)"
+          % (1000 * (time.perf_counter() - start), equity))
@@ -0,0 +1,51 @@
+import os
+import random
+import tempfile
+import time
+import numpy as np
+from agents.RandomPlayer import RandomPlayer
+from game.HandHistory import HandHistory, RECORD, read_hands, net_results
+from game.Poker import Poker
+
+
+def play(hands, hand_history=None):
+    """
+    :return: Hands per second and the net chips of every hand
+    """
+    game = Poker([RandomPlayer(i + 1) for i in range(6)], 10, 1000, hand_history=hand_history)
+    results = []
+    start = time.perf_counter()
+    for _ in range(hands):
+        for player in game.players:
+            player.add_stack(1000 - player.stack)
+        results.append(game.play_round())
+        game.board = []
+        game.rotate_button()
+    return hands / (time.perf_counter() - start), results
+
+
+if __name__ == "__main__":
+    hands = 50000
+    path = os.path.join(tempfile.mkdtemp(), 'hands.bin')
+    plain, logged = 0, 0
+    for _ in range(3):  # Best of three, interleaved
+        random.seed(0)
+        speed, expected = play(hands)
+        plain = max(plain, speed)
+        random.seed(0)
+        if os.path.exists(path):
+            os.remove(path)
+        with HandHistory(path) as hand_history:
+            logged = max(logged, play(hands, hand_history)[0])
+    print("6 random players, hands/sec: %.0f without a log, %.0f writing every hand (%.1f%% overhead)"
+          % (plain, logged, 100 * (plain / logged - 1)))
+
+    start = time.perf_counter()
+    replayed = [net_results(hand) for hand in read_hands(path)]
+    duration = time.perf_counter() - start
+    size = os.path.getsize(path)
+    print("%i hands in %.1f MB (%i byte records, %.0f bytes/hand), read back at %.0f hands/sec"
+          % (len(replayed), size / 2 ** 20, RECORD.size, size / len(replayed), len(replayed) / duration))
+    print("hands whose replayed results differ: %i"
+          % sum(not np.allclose([result[uuid] for uuid in sorted(result)], [other[uuid] for uuid in sorted(result)])
+                for result, other in zip(expected, replayed)))
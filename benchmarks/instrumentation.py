@@ -0,0 +1,47 @@
+import json
+import random
+import timeit
+import numpy as np
+from agents.RandomPlayer import RandomPlayer
+from game.GameWrapper import GameWrapper
+from game.Poker import Poker
+from util import instrumentation
+from util.montecarlo import Evaluation
+
+
+def workload():
+    """
+    Some hands of Poker, CFR iterations and equity estimates
+    """
+    game = Poker([RandomPlayer(i + 1) for i in range(6)], 10, 1000)
+    for _ in range(2000):
+        for player in game.players:
+            player.add_stack(1000 - player.stack)
+        game.play_round()
+        game.board = []
+    GameWrapper().iterate(300)
+    for _ in range(20):
+        Evaluation().run_evaluation(card1=[14, 0], card2=[13, 0], tablecards=[[12, 1], [7, 2], [2, 3]],
+                                    iterations=5000, player_amount=3)
+
+
+def best_time(function, repeats=3):
+    return min(timeit.repeat(function, number=1, repeat=repeats))
+
+
+if __name__ == "__main__":
+    random.seed(0)
+    np.random.seed(0)
+    calls = 10 ** 6
+    print("disabled: count %.0f ns, timer %.0f ns per call"
+          % (1e9 * best_time(lambda: [instrumentation.count('x') for _ in range(calls)]) / calls,
+             1e9 * best_time(lambda: [instrumentation.timer('x').__exit__(None, None, None)
+                                      for _ in range(calls)]) / calls))
+
+    disabled = best_time(workload)
+    instrumentation.enable()
+    enabled = best_time(workload)
+    print("workload: %.2f s disabled, %.2f s enabled" % (disabled, enabled))
+    instrumentation.reset()
+    workload()
+    print(json.dumps(instrumentation.snapshot(), indent=1))
@@ -0,0 +1,57 @@
+import random
+from util.algorithms import A
+
+CARDS = 'JQK'
+DEALS = [(a, b) for a in range(3) for b in range(3) if a != b]
+GAME_VALUE = -1 / 18  # Value of Kuhn poker for the first player at equilibrium
+
+
+class KuhnNode:
+    """
+    Kuhn poker in the node interface expected by util.algorithms.
+    The root deals the cards, then players alternate (c)heck/(c)all, (b)et or (f)old.
+    """
+    def __init__(self, cards=None, history=''):
+        self.cards = cards
+        self.history = history
+        if cards is None:
+            self.actions = DEALS
+            self.to_move = 0
+        else:
+            self.actions = [] if self.is_terminal() else (['f', 'c'] if history.endswith('b') else ['c', 'b'])
+            self.to_move = A if len(history) % 2 == 0 else -A
+        self.children = {action: KuhnNode(action) if cards is None else KuhnNode(cards, history + action)
+                         for action in self.actions}
+
+    def play(self, action):
+        return self.children[action]
+
+    def is_chance(self):
+        return self.cards is None
+
+    def chance_prob(self):
+        return 1. / len(DEALS)
+
+    def sample_one(self):
+        return self.children[random.choice(self.actions)]
+
+    def is_terminal(self):
+        return self.history in ['cc', 'bc', 'bf', 'cbc', 'cbf']
+
+    def inf_set(self):
+        if self.cards is None:
+            return '.'
+        if self.is_terminal():
+            return CARDS[self.cards[0]] + CARDS[self.cards[1]] + '.' + self.history
+        return CARDS[self.cards[0 if self.to_move == A else 1]] + '.' + self.history
+
+    def evaluation(self):
+        """
+        Chips won by the first player
+        """
+        if self.history == 'bf':
+            return 1
+        if self.history == 'cbf':
+            return -1
+        stake = 1 if self.history == 'cc' else 2
+        return stake if self.cards[0] > self.cards[1] else -stake
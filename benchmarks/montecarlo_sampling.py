@@ -0,0 +1,92 @@
+import time
+import tracemalloc
+import numpy as np
+from treys import Deck
+from agents.EquityPlayer import EquityPlayer
+from game.Action import Action
+from util.montecarlo import Evaluation, sample_cards, EXACT_THRESHOLD, CHUNK_SIZE
+
+
+def argsort_cards(deck, iterations, n):
+    """
+    Previous sampler of Evaluation.distribute_cards: a full argsort of random keys for every copy of the deck
+    """
+    decks = np.tile(deck, reps=(iterations, 1))
+    idx = np.argsort(np.random.random(decks.shape), axis=-1)
+    return decks[np.arange(iterations)[:, None], idx][:, :n]
+
+
+def samples_per_second(sampler, iterations, n, repeats=20):
+    deck = np.arange(5, 55)
+    start = time.perf_counter()
+    for _ in range(repeats):
+        sampler(deck, iterations, n)
+    return repeats * iterations / (time.perf_counter() - start)
+
+
+def peak_memory(iterations, player_amount, chunk_size):
+    """
+    :return: Peak megabytes allocated by run_evaluation and its duration in seconds
+    """
+    tracemalloc.start()
+    start = time.perf_counter()
+    Evaluation().run_evaluation(card1=[14, 0], card2=[13, 0], tablecards=[], iterations=iterations,
+                                player_amount=player_amount, chunk_size=chunk_size)
+    duration = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1] / 2 ** 20
+    tracemalloc.stop()
+    return peak, duration
+
+
+def max_frequency_error(sampler, iterations=200000, n=9):
+    """
+    Largest deviation from uniform of how often each card lands in each drawn position
+    """
+    deck = np.arange(50)
+    cards = sampler(deck, iterations, n)
+    counts = np.stack([np.bincount(cards[:, i], minlength=len(deck)) for i in range(n)])
+    return np.abs(counts / iterations * len(deck) - 1).max()
+
+
+if __name__ == "__main__":
+    np.random.seed(0)
+    iterations = 10000
+    for players in [2, 3, 6]:
+        n = 5 + 2 * (players - 1)
+        print("%i players: argsort %.0f samples/sec, partial Fisher-Yates %.0f samples/sec"
+              % (players, samples_per_second(argsort_cards, iterations, n),
+                 samples_per_second(sample_cards, iterations, n)))
+    print("max relative frequency error: argsort %.3f, partial Fisher-Yates %.3f"
+          % (max_frequency_error(argsort_cards), max_frequency_error(sample_cards)))
+
+    start = time.perf_counter()
+    equity = Evaluation().run_evaluation(card1=[9, 0], card2=[2, 1], tablecards=[[5, 3], [3, 2]],
+                                         iterations=iterations, player_amount=3)
+    print("run_evaluation with %i iterations: %.1f ms (equity %.3f)"
+          % (iterations, 1000 * (time.perf_counter() - start), equity))
+
+    board = [[12, 1], [7, 2], [2, 3], [9, 0], [10, 2]]
+    for street, table in [("turn", board[:4]), ("river", board)]:
+        for threshold in [-1, EXACT_THRESHOLD]:  # Always sample, then the default
+            evaluator = Evaluation()
+            start = time.perf_counter()
+            equity = evaluator.run_evaluation(card1=[14, 0], card2=[13, 0], tablecards=table, iterations=iterations,
+                                              player_amount=2, exact_threshold=threshold)
+            print("heads-up %s, %s over %i deals: %.1f ms (equity %.4f)"
+                  % (street, evaluator.mode, evaluator.samples, 1000 * (time.perf_counter() - start), equity))
+
+    # Deals needed by EquityPlayer's decisions with the adaptive estimate on random preflop and flop spots
+    player, samples = EquityPlayer(1), []
+    start = time.perf_counter()
+    for _ in range(100):
+        cards = Deck.GetFullDeck()
+        np.random.shuffle(cards)
+        thresholds = player.thresholds([Action.FOLD, Action.CALL, Action.BET3BB, Action.ALLIN])
+        samples.append(player.estimate_hand(cards[:2], cards[2:2 + np.random.choice([0, 3])],
+                                            np.random.randint(2, 5), 10000, thresholds).samples)
+    print("adaptive decisions: %.1f ms each, deals used at the 25/50/75/90th percentile: %s"
+          % (10 * (time.perf_counter() - start), np.percentile(samples, [25, 50, 75, 90]).tolist()))
+
+    for chunk_size in [100000, CHUNK_SIZE]:
+        print("100000 iterations, 9 players, chunks of %i deals: peak %.1f MB in %.2f s"
+              % ((chunk_size,) + peak_memory(100000, 9, chunk_size)))
@@ -0,0 +1,42 @@
+import subprocess
+import sys
+import time
+from multiprocessing import get_context
+
+HEAVY = ['pyglet', 'matplotlib', 'torch']
+
+
+def import_time(statement, repeats=5):
+    """
+    Fastest wall time of a fresh interpreter running an import, minus that of an empty one
+    :return: Seconds and the heavy modules the import loaded
+    """
+    check = "import sys; print(','.join(m for m in %r if m in sys.modules))" % HEAVY
+
+    def run(code):
+        start = time.perf_counter()
+        output = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True).stdout
+        return time.perf_counter() - start, output.strip()
+
+    empty = min(run('pass')[0] for _ in range(repeats))
+    runs = [run(statement + '; ' + check) for _ in range(repeats)]
+    return min(seconds for seconds, _ in runs) - empty, runs[0][1]
+
+
+def worker_startup(method, imports, workers=2):
+    """
+    Seconds until a pool of fresh workers that import the given module has answered
+    """
+    start = time.perf_counter()
+    with get_context(method).Pool(workers, initializer=__import__, initargs=(imports,)) as pool:
+        pool.map(abs, range(workers))
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    for statement in ['import numpy, treys', 'import game.Poker', 'import game.GameWrapper',
+                      'import game.Simulator', 'import main']:
+        seconds, heavy = import_time(statement)
+        print("%-26s %6.0f ms  heavy modules loaded: %s" % (statement, 1000 * seconds, heavy or 'none'))
+    for module in ['game.Poker', 'game.GameWrapper']:
+        print("spawn pool of 2 workers importing %-16s %6.0f ms" % (module, 1000 * worker_startup('spawn', module)))
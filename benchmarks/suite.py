@@ -0,0 +1,151 @@
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import time
+import numpy as np
+from agents.RandomPlayer import RandomPlayer
+from game.Action import Action
+from game.GameWrapper import GameWrapper
+from game.Poker import Poker
+from util.InfoSetTable import InfoSetTable
+from util.Node import Node
+from util.montecarlo import Evaluation
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), 'baseline.json')
+
+
+def equity(players):
+    def run(iterations):
+        Evaluation().run_evaluation(card1=[14, 0], card2=[13, 0], tablecards=[], iterations=iterations,
+                                    player_amount=players)
+    return run
+
+
+def play_rounds(hands):
+    game = Poker([RandomPlayer(i + 1) for i in range(6)], 10, 1000)
+    for _ in range(hands):
+        for player in game.players:
+            player.add_stack(1000 - player.stack)
+        game.play_round()
+        game.board = []
+        game.rotate_button()
+
+
+def copies(n):
+    game = Poker([RandomPlayer(i + 1) for i in range(6)], 10, 1000)
+    game.reset_bets()
+    game.deal_cards()
+    game.step_blind(False)
+    game.step_blind(True)
+    for _ in range(n):
+        game.copy()
+
+
+def get_strategy(n):
+    node = Node([Action.FOLD, Action.CALL, Action.BET3BB, Action.ALLIN], InfoSetTable(4))
+    node.add_regret([1.0, -2.0, 3.0, 0.5])
+    for _ in range(n):
+        node.get_strategy(1.0)
+
+
+def cfr_iterations(iterations):
+    GameWrapper().iterate(iterations)  # The loop of GameWrapper.train without its plotting
+
+
+# Name, function doing an amount of work, standard amount and its unit
+CASES = [
+    ('run_evaluation_2p', equity(2), 10000, 'deals'),
+    ('run_evaluation_6p', equity(6), 10000, 'deals'),
+    ('run_evaluation_9p', equity(9), 10000, 'deals'),
+    ('play_round', play_rounds, 100000, 'hands'),
+    ('poker_copy', copies, 100000, 'copies'),
+    ('node_get_strategy', get_strategy, 100000, 'calls'),
+    ('cfr_iterate', cfr_iterations, 10000, 'iterations'),
+]
+
+
+def machine():
+    return {'platform': platform.platform(), 'processor': platform.processor(), 'cpus': os.cpu_count(),
+            'python': platform.python_version(), 'numpy': np.__version__}
+
+
+def run(names=None, repeats=3, scale=1.0):
+    """
+    Time every case with fixed seeds
+    :param names: Cases to run, all by default
+    :param repeats: Runs of each case, the fastest is kept
+    :param scale: Multiplier of the standard amounts of work
+    :return: {name: {'seconds', 'amount', 'unit', 'rate'}}
+    """
+    results = {}
+    for name, function, amount, unit in CASES:
+        if names and name not in names:
+            continue
+        amount = max(1, int(amount * scale))
+        function(max(1, amount // 100))  # Warm up, e.g. build the lookup tables
+        times = []
+        for _ in range(repeats):
+            random.seed(0)
+            np.random.seed(0)
+            start = time.perf_counter()
+            function(amount)
+            times.append(time.perf_counter() - start)
+        results[name] = {'seconds': min(times), 'amount': amount, 'unit': unit, 'rate': amount / min(times)}
+        print("%-20s %10.3f s %12.0f %s/sec" % (name, min(times), amount / min(times), unit))
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """
+    :param tolerance: Fraction by which a case may be slower than its baseline
+    :return: Names of the cases slower than the baseline allows
+    """
+    regressions = []
+    for name, result in results.items():
+        if name not in baseline['results']:
+            print("%-20s no baseline" % name)
+            continue
+        expected = baseline['results'][name]
+        # Rates make runs of different amounts comparable
+        ratio = expected['rate'] / result['rate']
+        status = 'ok'
+        if ratio > 1 + tolerance:
+            status = 'REGRESSION'
+            regressions.append(name)
+        elif ratio < 1 / (1 + tolerance):
+            status = 'faster'
+        print("%-20s %8.2fx the baseline time  %s" % (name, ratio, status))
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time the hot paths and compare them with a stored baseline")
+    parser.add_argument('--only', nargs='*', help="Cases to run")
+    parser.add_argument('--repeats', type=int, default=3)
+    parser.add_argument('--scale', type=float, default=1.0, help="Multiplier of the standard amounts of work")
+    parser.add_argument('--output', help="JSON file the results are written to")
+    parser.add_argument('--baseline', default=BASELINE_PATH)
+    parser.add_argument('--tolerance', type=float, default=0.25, help="Allowed slowdown, 0.25 is 25%%")
+    parser.add_argument('--update', action='store_true', help="Store the results as the baseline")
+    args = parser.parse_args()
+
+    report = {'machine': machine(), 'results': run(args.only, args.repeats, args.scale)}
+    if args.output:
+        with open(args.output, 'w') as stream:
+            json.dump(report, stream, indent=1)
+    if args.update:
+        with open(args.baseline, 'w') as stream:
+            json.dump(report, stream, indent=1)
+        sys.exit(0)
+    if not os.path.exists(args.baseline):
+        print("No baseline at %s, store one with --update" % args.baseline)
+        sys.exit(0)
+
+    with open(args.baseline) as stream:
+        baseline = json.load(stream)
+    if baseline['machine'] != report['machine']:
+        print("Baseline recorded on a different machine: %s" % baseline['machine'])
+    sys.exit(1 if compare(report['results'], baseline, args.tolerance) else 0)
@@ -0,0 +1,240 @@
+from treys import Deck
+from game.Action import Action
+from game.InfoSet import InfoSetEncoder, N_ACTION_IDS
+from game.Poker import Poker
+from game.Showdown import batch_winners
+import numpy as np
+
+BET_MULS = np.zeros(N_ACTION_IDS)
+for _action in Action:
+    BET_MULS[_action.id] = _action.bet_mul
+
+
+def action_mask(actions):
+    """
+    :param actions: List of Action.py
+    :return: [N_ACTION_IDS] boolean mask of the actions
+    """
+    mask = np.zeros(N_ACTION_IDS, dtype=bool)
+    mask[[action.id for action in actions]] = True
+    return mask
+
+
+class BatchPoker:
+    """
+    Plays one hand at each of many tables in lockstep with the rules of Poker.play_round.
+    The state of every table is held in arrays and each step advances every unfinished
+    table by one decision, players choose for all the tables they act at through act_batch.
+    Seats follow the order of the participants, seat 0 posts the small blind.
+    Equal best hands split the pot.
+    """
+    MAX_RAISES = Poker.MAX_RAISES
+    BET_ACTIONS = Poker.BET_ACTIONS
+    STREETS = [3]  # Cards revealed after each betting round, as in Poker.play_round
+
+    def __init__(self, participants, big_blind, n_tables):
+        """
+        :param participants: List of players, the same players sit at every table
+        :param big_blind: Cost of playing a hand
+        :param n_tables: Number of hands played at once
+        """
+        self.players = [x for x in participants]
+        self.big_blind = big_blind
+        self.n_tables = n_tables
+        self.encoder = InfoSetEncoder(len(self.players))
+
+        # Longest history: both blinds, one action per seat and a response of every other seat to the raises
+        digits = 2 + len(self.players) + self.MAX_RAISES * (len(self.players) - 1)
+        # History ids of six or more seats outgrow int64, they are kept as two int64 limbs of
+        # low_digits and the remaining digits, id = high * low_limit + low
+        self.low_digits = 1
+        while self.encoder.base ** (self.low_digits + 2) < 2 ** 63:
+            self.low_digits += 1
+        self.low_limit = self.encoder.base ** self.low_digits
+        self.split = self.encoder.base ** digits >= 2 ** 63
+        self.high_dtype = np.int64 if self.encoder.base ** max(0, digits - self.low_digits) < 2 ** 63 else object
+
+        self.first_actions = action_mask([Action.FOLD, Action.CALL] + self.BET_ACTIONS)
+        self.later_actions = action_mask([Action.FOLD, Action.CHECK] + self.BET_ACTIONS)
+        self.response_actions = action_mask([Action.FOLD, Action.CALL])
+        self.bet_actions = action_mask(self.BET_ACTIONS)
+
+    def deal(self, decks=None):
+        """
+        :param decks: [n_tables, 52] treys card integers in the order they are drawn, shuffled if None
+        """
+        n, seats = self.n_tables, len(self.players)
+        if decks is None:
+            decks = np.array(Deck.GetFullDeck())[np.argsort(np.random.random((n, 52)), axis=1)]
+        decks = np.asarray(decks, dtype=np.int64)
+        self.cards = np.sort(decks[:, :2 * seats].reshape(n, seats, 2), axis=2)
+        self.board = decks[:, 2 * seats:2 * seats + sum(self.STREETS)]
+        self.n_board = np.zeros(n, dtype=np.int64)
+
+    def reset(self, stacks):
+        n, seats = self.n_tables, len(self.players)
+        self.stacks = np.broadcast_to(np.asarray(stacks, dtype=np.float64), (n, seats)).copy()
+        self.bets = np.zeros((n, seats))
+        self.paid = np.zeros((n, seats))
+        self.pot = np.zeros(n)
+        self.in_hand = np.ones((n, seats), dtype=bool)
+        self.n_in_hand = np.full(n, seats)
+        self.visited = np.zeros(n, dtype=np.int64)
+        self.bet_count = np.full(n, self.MAX_RAISES)
+        self.all_in = np.zeros(n, dtype=bool)
+        self.street = np.zeros(n, dtype=np.int64)
+        self.done = np.zeros(n, dtype=bool)
+        self.history_low = np.zeros(n, dtype=np.int64)
+        self.history_high = np.zeros(n, dtype=self.high_dtype)
+        self.legal = np.tile(self.first_actions, (n, 1))
+
+    def post_blinds(self):
+        """
+        Small blind at seat 0 and big blind at seat 1, action starts at seat 2
+        """
+        tables = np.arange(self.n_tables)
+        for seat, amount in [(0, self.big_blind / 2), (1, self.big_blind)]:
+            self.bets[:, seat] += amount
+            self.stacks[:, seat] = np.maximum(0, self.stacks[:, seat] - amount)
+            self.record(tables, np.full(self.n_tables, seat), np.full(self.n_tables, Action.BET1BB.id))
+        self.actor = np.full(self.n_tables, 2 % len(self.players))
+
+    def record(self, tables, seats, actions):
+        low = self.history_low[tables] * self.encoder.base + seats * N_ACTION_IDS + actions + 1
+        if self.split:
+            self.history_high[tables] = self.history_high[tables] * self.encoder.base + low // self.low_limit
+            low %= self.low_limit
+        self.history_low[tables] = low
+
+    def history_ids(self, tables=None):
+        """
+        History ids of some tables as game.InfoSet.InfoSetEncoder builds them
+        :param tables: Indices of the tables, all of them if None
+        :return: int64 array, or an object array of Python integers when an id outgrows int64
+        """
+        tables = slice(None) if tables is None else tables
+        low, high = self.history_low[tables], self.history_high[tables]
+        if not high.any():
+            return low
+        return high.astype(object) * self.low_limit + low.astype(object)
+
+    def states(self, tables):
+        """
+        What the acting player observes at some tables
+        :return: Dictionary of arrays with one row per table
+        """
+        seats = self.actor[tables]
+        return {
+            "table": tables,
+            "seat": seats,
+            "cards": self.cards[tables, seats],
+            "board": self.board[tables],
+            "n_board": self.n_board[tables],
+            "history_id": self.history_ids(tables),
+            "bets": self.bets[tables],
+            "stacks": self.stacks[tables]
+        }
+
+    def step(self):
+        """
+        Ask the acting player of every unfinished table for an action and apply it
+        """
+        tables = np.flatnonzero(~self.done)
+        actions = np.empty(len(tables), dtype=np.int64)
+        seats = self.actor[tables]
+        for seat, player in enumerate(self.players):
+            mine = seats == seat
+            if mine.any():
+                actions[mine] = player.act_batch(self.states(tables[mine]), self.legal[tables[mine]])
+        self.apply(tables, actions)
+
+    def apply(self, tables, actions):
+        """
+        Vectorised Poker.step_bets
+        :param tables: Indices of the tables
+        :param actions: Action id taken by the acting player of each table
+        """
+        seats = self.actor[tables]
+        stacks = self.stacks[tables, seats]
+        amounts = np.minimum(stacks, BET_MULS[actions] * self.big_blind)
+        forced = amounts >= stacks
+        actions = np.where(forced, np.where(self.all_in[tables], Action.CALL.id, Action.ALLIN.id), actions)
+        self.record(tables, seats, actions)
+
+        fold = actions == Action.FOLD.id
+        self.in_hand[tables[fold], seats[fold]] = False
+        self.n_in_hand[tables[fold]] -= 1
+
+        stay, stay_seats = tables[~fold], seats[~fold]
+        self.visited[stay] += 1
+        debt = self.bets[stay].max(axis=1) - self.bets[stay, stay_seats]
+        self.bets[stay, stay_seats] += np.minimum(amounts[~fold] + debt, self.stacks[stay, stay_seats])
+
+        raised = ~fold & (actions != Action.CALL.id) & (actions != Action.CHECK.id)
+        raisers = tables[raised]
+        self.bet_count[raisers] -= 1
+        self.visited[raisers] = 1
+        self.all_in[raisers] = actions[raised] == Action.ALLIN.id
+        self.legal[raisers] = self.response_actions
+        reraise = raisers[~self.all_in[raisers] & (self.bet_count[raisers] > 0)]
+        self.legal[reraise] |= self.bet_actions
+
+        # Next player still in the hand after the actor
+        order = (seats[:, None] + 1 + np.arange(len(self.players))) % len(self.players)
+        self.actor[tables] = order[np.arange(len(tables)), self.in_hand[tables[:, None], order].argmax(axis=1)]
+
+        over = (self.visited[tables] >= self.n_in_hand[tables]) | (self.n_in_hand[tables] <= 1)
+        self.end_round(tables[over])
+
+    def end_round(self, tables):
+        """
+        Collect the bets and reveal cards until a betting round can start, tables without one are done
+        """
+        self.pot[tables] += self.bets[tables].sum(axis=1)
+        self.paid[tables] += self.bets[tables]
+        self.bets[tables] = 0
+        self.visited[tables] = 0
+        self.legal[tables] = self.later_actions
+        self.done[tables] = True
+
+        streets = np.array(self.STREETS)
+        tables = tables[self.n_in_hand[tables] > 1]
+        while len(tables):
+            self.n_board[tables] += streets[self.street[tables]]
+            self.street[tables] += 1
+            tables = tables[self.street[tables] < len(streets)]
+            betting = tables[~self.all_in[tables]]
+            self.done[betting] = False
+            self.bet_count[betting] = self.MAX_RAISES
+            tables = tables[self.all_in[tables]]
+
+    def showdown(self):
+        """
+        :return: [n_tables, n_players] mask of the players sharing each pot
+        """
+        winners = self.in_hand.copy()
+        for n_board in np.unique(self.n_board):
+            tables = np.flatnonzero((self.n_in_hand > 1) & (self.n_board == n_board))
+            if len(tables):
+                winners[tables] = batch_winners(self.cards[tables], self.board[tables, :n_board],
+                                                self.in_hand[tables])
+        return winners
+
+    def play_round(self, stacks, decks=None):
+        """
+        Executes a hand of poker at every table
+        :param stacks: Chips of each player at the start of the hand, a number or [n_tables, n_players]
+        :param decks: [n_tables, 52] treys card integers in the order they are drawn, shuffled if None
+        :return: [n_tables, n_players] chips won minus chips bet, as Poker.play_round
+        """
+        self.deal(decks)
+        self.reset(stacks)
+        self.post_blinds()
+        while not self.done.all():
+            self.step()
+
+        self.winners = self.showdown()
+        shares = self.winners * (self.pot / self.winners.sum(axis=1))[:, None]  # Ties split the pot
+        self.stacks += shares
+        self.paid -= shares
+        return -self.paid
@@ -0,0 +1,93 @@
+from game.Action import Action
+
+
+class GameState:
+    """
+    Compact betting state of a hand that can make and unmake actions in place.
+    Replays the rules of Poker.step_bets and PlayerList without copying the game,
+    players are referred to by their seat (index into Poker.players).
+    """
+    __slots__ = ['big_blind', 'encoder', 'bet_actions', 'call_actions', 'cards', 'stacks', 'bets',
+                 'rotation', 'pos', 'visited', 'bet_count', 'all_in', 'actions', 'history_id', '_undo']
+
+    def __init__(self, game, actions):
+        """
+        :param game: Poker.py in the middle of a betting round
+        :param actions: Actions available to the next player
+        """
+        seats = {player.uuid: i for i, player in enumerate(game.players)}
+        self.big_blind = game.big_blind
+        self.encoder = game.encoder
+        self.bet_actions = [Action.FOLD, Action.CALL] + game.BET_ACTIONS
+        self.call_actions = [Action.FOLD, Action.CALL]
+        self.cards = [player.cards for player in game.players]
+        self.stacks = [player.stack for player in game.players]
+        self.bets = [game.bets[player.uuid] for player in game.players]
+        self.rotation = [seats[player.uuid] for player in game.player_list.rotation]
+        self.pos = game.player_list.pos
+        self.visited = game.player_list.visited
+        self.bet_count = game.bet_count
+        self.all_in = game.all_in
+        self.actions = actions
+        self.history_id = game.history_id
+        self._undo = []
+
+    def is_terminal(self):
+        """
+        Mirrors PlayerList.visited_all
+        """
+        return self.visited >= len(self.rotation) or len(self.rotation) <= 1
+
+    def to_act(self):
+        """
+        :return: Seat of the next player to act
+        """
+        return self.rotation[self.pos]
+
+    def apply(self, action):
+        """
+        Make an action for the next player, equivalent to Poker.step_bets
+        :param action: Action.py
+        :return: Actions available to the following player
+        """
+        seat = self.rotation[self.pos]
+        stack = self.stacks[seat]
+        amount = min(stack, action.bet_mul * self.big_blind)
+        if amount >= stack:
+            action = Action.CALL if self.all_in else Action.ALLIN
+        folded = self.pos if action == Action.FOLD else -1
+
+        self._undo.append((self.pos, self.visited, self.bet_count, self.all_in, self.actions,
+                           self.history_id, seat, self.bets[seat], folded))
+        self.pos = (self.pos + 1) % len(self.rotation)
+        self.visited += 1
+        self.history_id = self.encoder.extend(self.history_id, seat, action)
+
+        if folded >= 0:
+            # player is not participating in this hand
+            del self.rotation[folded]
+            self.pos = max(self.pos - 1, 0)
+            self.visited -= 1
+            return self.actions
+
+        debt = max(self.bets) - self.bets[seat]
+        self.bets[seat] += min(amount + debt, stack)
+
+        if action != Action.CALL and action != Action.CHECK:
+            self.bet_count -= 1
+            self.visited = 1  # Re-visit all proceeding players
+            self.all_in = action == Action.ALLIN
+            self.actions = self.bet_actions if not self.all_in and self.bet_count > 0 \
+                else self.call_actions
+
+        return self.actions
+
+    def undo(self):
+        """
+        Unmake the most recent action
+        """
+        (self.pos, self.visited, self.bet_count, self.all_in, self.actions,
+         self.history_id, seat, bet, folded) = self._undo.pop()
+        self.bets[seat] = bet
+        if folded >= 0:
+            self.rotation.insert(folded, seat)
@@ -1,51 +1,306 @@
 from game.Poker import *
+from game.InfoSet import hand_class, ACTIONS_BY_ID, N_HAND_CLASSES, N_ACTION_IDS
+from game.GameState import GameState
 from agents.PlayerShell import *
+from agents.StrategyPlayer import save_strategy
 from util.Node import *
-import matplotlib.pyplot as plt
+from util.InfoSetTable import InfoSetTable
+from util.VectorCFR import VectorCFR
+from util.update_rules import get_update_rule
+from util.exploitability import PreflopBestResponse
+from util import combos
+from util.equity import default_equity
+from util import instrumentation
+import numpy as np
+import os
+import random
+from multiprocessing import Pool
 
 
 class GameWrapper:
 
-    def __init__(self):
+    def __init__(self, equity=None):
+        """
+        :param equity: [1326, 1326] showdown equity of the row combo against the column combo.
+                       Defaults to util.equity.default_equity, the exact matrix once it has been cached
+        """
+        self.equity = default_equity() if equity is None else equity
         self.game_states = {}
+        self.table = InfoSetTable(2 + len(Poker.BET_ACTIONS))
         self.players = [
             PlayerShell(1),
             PlayerShell(2)
         ]
         self.game = Poker(self.players, 2, 10, True)
         self.actions = []
+        self.hand_classes = []
+        self.combos = []  # Row of each player's hole cards in the equity matrix
+        self.iteration = 0  # Discounting steps applied, the t of util.update_rules
+        self.best_response = None  # util.exploitability.PreflopBestResponse, built on first use
+
+    def info_set(self, state, seat):
+        """
+        Integer key of the information set of the player at seat
+        """
+        return self.game.encoder.key(state.history_id, seat, self.hand_classes[seat])
+
+    def decode_state(self, key):
+        """
+        Debugging view of an information set key, e.g. ('8Qo', 1, "['C', 'B']")
+        """
+        return self.game.encoder.decode(key, [player.uuid for player in self.players])
+
+    def snapshot(self):
+        """
+        Copy of every information set key and the table rows they map to
+        """
+        arrays = self.table.to_arrays()
+        arrays['keys'] = np.array(list(self.game_states), dtype=np.int64)
+        return arrays
+
+    def restore(self, snapshot):
+        """
+        Replace the information sets with those of a snapshot
+        """
+        arrays = {k: v for k, v in snapshot.items() if k != 'keys'}
+        self.table = InfoSetTable.from_arrays(arrays)
+        self.game_states = {}
+        action_lists = {}
+        for index, key in enumerate(snapshot['keys'].tolist()):
+            ids = tuple(self.table.actions[index, :self.table.n_actions[index]].tolist())
+            if ids not in action_lists:
+                action_lists[ids] = [ACTIONS_BY_ID[i] for i in ids]
+            self.game_states[key] = Node(action_lists[ids], self.table, index)
+
+    def merge(self, deltas):
+        """
+        Add the regret and strategy sums accumulated elsewhere onto this table
+        :param deltas: Snapshot whose sums are increments rather than totals
+        """
+        rows = []
+        for index, key in enumerate(deltas['keys'].tolist()):
+            if key not in self.game_states:
+                ids = deltas['actions'][index, :deltas['n_actions'][index]].tolist()
+                self.game_states[key] = Node([ACTIONS_BY_ID[i] for i in ids], self.table)
+            rows.append(self.game_states[key].index_)
+        self.table.regret_sum[rows] += deltas['regret_sum']
+        self.table.strategy_sum[rows] += deltas['strategy_sum']
+
+    def save_checkpoint(self, path, run=None):
+        """
+        Write the training state to an uncompressed .npz file, replacing it atomically
+        :param path: Destination file
+        :param run: Progress of an ongoing train call, see train
+        """
+        arrays = self.snapshot()
+        arrays['iteration'] = np.array(self.iteration)
+        arrays['random_state'], arrays['random_gauss'] = _pack_random([random.getstate()])
+        if run is not None:
+            arrays['done'] = np.array(run['done'])
+            arrays['util'] = np.array(run['util'])
+            arrays['utils'] = np.array(run['utils'], dtype=np.float64)
+            arrays['steps'] = np.array(run.get('steps', []), dtype=np.int64)
+            if 'streams' in run:
+                arrays['streams'], arrays['streams_gauss'] = _pack_random(run['streams'])
+
+        with open(path + '.tmp', 'wb') as stream:
+            np.savez(stream, **arrays)
+        os.replace(path + '.tmp', path)
+
+    def load_checkpoint(self, path):
+        """
+        Restore the information sets, iteration count and random state written by save_checkpoint
+        :return: Progress of the interrupted train call, None if there was none
+        """
+        with np.load(path) as checkpoint:
+            arrays = {name: checkpoint[name] for name in checkpoint.files}
+        self.restore({name: arrays[name] for name in ['keys', 'regret_sum', 'strategy', 'strategy_sum',
+                                                      'actions', 'n_actions']})
+        self.iteration = int(arrays['iteration'])
+        random.setstate(_unpack_random(arrays['random_state'], arrays['random_gauss'])[0])
+        if 'done' not in arrays:
+            return None
+
+        run = {'done': int(arrays['done']), 'util': float(arrays['util']),
+               'utils': arrays['utils'].tolist(), 'steps': arrays['steps'].tolist()}
+        if 'streams' in arrays:
+            run['streams'] = _unpack_random(arrays['streams'], arrays['streams_gauss'])
+        return run
+
+    def discount(self, rule):
+        """
+        Count a completed iteration or batch of sampled deals and apply the discounting
+        of an update rule to the table
+        :param rule: util.update_rules.DiscountedCFR
+        """
+        self.iteration += 1
+        if not rule.is_vanilla():
+            self.table.discount(*rule.discounts(self.iteration))
+
+    def iterate(self, iterations, update_rule=None):
+        """
+        Run chance sampled CFR on freshly dealt hands. The hands form one batch,
+        the discounting of the update rule is applied once after all of them.
+        :param update_rule: Name or instance of a util.update_rules rule, None leaves the table undiscounted
+        :return: Utility of player one summed over the iterations
+        """
+        util = 0.0
+        for _ in range(iterations):
+            with instrumentation.timer('cfr.iterations'):
+                game = self.game.copy()
+                actions = self.start_game(game)
+                util += self.cfr(GameState(game, actions), 1, 1, 0)
+        if update_rule is not None and iterations > 0:
+            self.discount(get_update_rule(update_rule))
+        return util
+
+    def exploitability(self, average=True):
+        """
+        Exploitability of the strategies in milli big blinds per hand, see util.exploitability
+        :param average: Evaluate the average strategy, otherwise the current one
+        """
+        if self.best_response is None:
+            self.best_response = PreflopBestResponse(self, self.equity)
+        return self.best_response.exploitability(average)
+
+    def converged(self, target, before, after, check_interval):
+        """
+        Measure the exploitability whenever the iteration count crosses a multiple of check_interval
+        :return: True if it is at or below the target
+        """
+        if target is None or after // check_interval == before // check_interval:
+            return False
+        exploitability = self.exploitability()
+        print("\rExploitability after %i iterations: %f mbb/hand" % (after, exploitability))
+        return exploitability <= target
+
+    def train(self, iterations, print_interval=1000, workers=1, sync_interval=10000, update_rule=None,
+              stop_at_exploitability=None, check_interval=10000, resume_from=None, checkpoint_path=None,
+              checkpoint_interval=100000, plot_path='ranges/util_trend.png', discount_interval=1000):
+        ''' Do ficticious self-play to find optimal strategy
+        :param workers: Number of processes sampling deals in parallel
+        :param sync_interval: Iterations each worker runs before its regrets are merged
+        :param update_rule: 'vanilla', 'cfr+', 'linear', 'dcfr' or a util.update_rules instance.
+                            The discounting is applied once per batch of discount_interval deals,
+                            with several workers once per merge.
+        :param stop_at_exploitability: Stop early once the average strategy is exploitable
+                                       by at most this many milli big blinds per hand
+        :param check_interval: Iterations between exploitability measurements
+        :param resume_from: Checkpoint of an interrupted run, training continues up to iterations in total
+        :param checkpoint_path: File to save the training state to every checkpoint_interval iterations
+        :param plot_path: Image of the average utility over the iterations, None to skip plotting
+        :param discount_interval: Deals sampled by a single worker between two discounting steps
+        '''
+        rule = get_update_rule(update_rule)
+        target = (stop_at_exploitability, check_interval)
+        checkpoint = (checkpoint_path, checkpoint_interval)
+        run = self.load_checkpoint(resume_from) if resume_from is not None else None
+        if workers > 1:
+            steps, utils, util = self.train_parallel(iterations, print_interval, workers, sync_interval, rule,
+                                                     target, checkpoint, run)
+        else:
+            utils, util = ([], 0.0) if run is None else (run['utils'], run['util'])
+            for i in range(len(utils), iterations):
+                utils.append(util / (i + 1))
+                if i % print_interval == 0 and i != 0:
+                    print("\rP1 expected value after %i iterations: %f" % (i, util / i))
+
+                # Start a game
+                util += self.iterate(1)
+                if (i + 1) % discount_interval == 0:
+                    self.discount(rule)
+                if checkpoint_path is not None and (i + 1) % checkpoint_interval == 0:
+                    self.save_checkpoint(checkpoint_path, {'done': i + 1, 'util': util, 'utils': utils})
+                if self.converged(stop_at_exploitability, i, i + 1, check_interval):
+                    break
+            steps = range(len(utils))
 
-    def hole_card_state(self, game, player):
-        suited = 'o'
-        if Card.get_suit_int(player.cards[0]) == Card.get_suit_int(player.cards[1]):
-            suited = 's'
-        card_rep = Card.STR_RANKS[Card.get_rank_int(player.cards[0])] + \
-                   Card.STR_RANKS[Card.get_rank_int(player.cards[1])] + suited
-        act_map = {Action.FOLD: "F", Action.CALL: "C", Action.BET1BB: "",
-                   Action.BET3BB: "B", Action.ALLIN: "AI"}
+        if plot_path is not None:
+            plot_utility(steps, utils, plot_path)
+        done = len(utils) if workers <= 1 else (steps[-1] if steps else 0)
+        return util / done if done else 0.0
 
-        acts = str([','.join([act_map[i[0]] for i in y if i[0] != Action.BET1BB]) for x, y in game.history.items()])
-        return card_rep, player.uuid, acts
+    def train_parallel(self, iterations, print_interval, workers, sync_interval, rule, target=(None, 1),
+                       checkpoint=(None, 1), run=None):
+        """
+        Each worker samples its own stream of deals against a copy of the table,
+        the regrets they accumulate are merged back every sync_interval iterations
+        :param target: Exploitability to stop at and the iterations between measurements
+        :param checkpoint: File to save the training state to and the iterations between saves
+        :param run: Progress restored by load_checkpoint
+        """
+        if run is not None and 'streams' in run:
+            streams, steps, utils, util = run['streams'], run['steps'], run['utils'], run['util']
+        else:
+            streams = [random.Random(random.getrandbits(64)).getstate() for _ in range(workers)]
+            steps, utils, util = [], [], 0.0
+        done = steps[-1] if steps else 0
+        with Pool(workers, initializer=_init_worker, initargs=(self.equity,)) as pool:
+            while done < iterations:
+                chunk = min(sync_interval, -(-(iterations - done) // workers))
+                counts = [max(0, min(chunk, iterations - done - w * chunk)) for w in range(workers)]
+                snapshot = self.snapshot()
+                results = pool.map(_train_worker, [(snapshot, streams[w], counts[w]) for w in range(workers)])
+                for w, (deltas, worker_util, stream) in enumerate(results):
+                    self.merge(deltas)
+                    streams[w] = stream
+                    util += worker_util
+                self.discount(rule)
+                self.table.regret_matching_all()
 
-    def train(self, iterations, print_interval=1000):
-        ''' Do ficticious self-play to find optimal strategy'''
+                if (done + sum(counts)) // print_interval > done // print_interval:
+                    print("\rP1 expected value after %i iterations: %f" % (done + sum(counts),
+                                                                           util / (done + sum(counts))))
+                done += sum(counts)
+                steps.append(done)
+                utils.append(util / done)
+                if checkpoint[0] is not None and done // checkpoint[1] > (done - sum(counts)) // checkpoint[1]:
+                    self.save_checkpoint(checkpoint[0], {'done': done, 'util': util, 'utils': utils,
+                                                         'steps': steps, 'streams': streams})
+                if self.converged(target[0], done - sum(counts), done, target[1]):
+                    break
+        return steps, utils, util
+
+    def solve(self, iterations, print_interval=100, update_rule=None, stop_at_exploitability=None,
+              check_interval=100):
+        """
+        Vector CFR over the public betting tree, each iteration updates every information set
+        :param update_rule: 'vanilla', 'cfr+', 'linear', 'dcfr' or a util.update_rules instance
+        :param stop_at_exploitability: Stop early once the average strategy is exploitable
+                                       by at most this many milli big blinds per hand
+        :param check_interval: Iterations between exploitability measurements
+        :return: Average expected value of player one
+        """
+        rule = get_update_rule(update_rule)
+        solver = VectorCFR(self, self.equity)
         util = 0.0
-        utils = []
         for i in range(iterations):
-            utils.append(util / (i + 1))
             if i % print_interval == 0 and i != 0:
                 print("\rP1 expected value after %i iterations: %f" % (i, util / i))
+            util += solver.iterate(rule)
+            if self.converged(stop_at_exploitability, i, i + 1, check_interval):
+                return util / (i + 1)
+        return util / iterations
 
-            # Start a game
-            game = self.game.copy()
-            actions = self.start_game(game)
-            util += self.cfr(actions, game, 1, 1, 0)
+    def export_strategy(self, path, average=True):
+        """
+        Pack the strategies into a file agents.StrategyPlayer can memory-map
+        :param path: .npy file of [histories, 169, N_ACTION_IDS] action probabilities,
+                     the (history id, seat) of each row is written next to it
+        :param average: Export the average strategy, otherwise the current one
+        """
+        rows = {}
+        for key in self.game_states:
+            history_id, seat, _ = self.game.encoder.split(key)
+            rows.setdefault((history_id, seat), len(rows))
 
-        plt.plot(range(iterations), utils)
-        plt.xlabel('iteration')
-        plt.ylabel('average utility')
-        plt.savefig('ranges/util_trend.png')
-        return util / iterations
+        strategy = np.zeros((len(rows), N_HAND_CLASSES, N_ACTION_IDS), dtype=np.float32)
+        for key, node in self.game_states.items():
+            history_id, seat, cls = self.game.encoder.split(key)
+            n = self.table.n_actions[node.index_]
+            probabilities = self.table.average_strategy(node.index_) if average else self.table.strategy[node.index_]
+            strategy[rows[history_id, seat], cls, self.table.actions[node.index_, :n]] = probabilities[:n]
+        save_strategy(path, strategy, list(rows))
 
     def get_strategy(self):
         """
@@ -66,10 +321,11 @@ class GameWrapper:
                 result[event[0] + "CALL"] = {}
                 result[event[0] + "FOLD"] = {}
 
-        for state, node in self.game_states.items():
+        for key, node in self.game_states.items():
+            state = self.decode_state(key)
             hand = state[0]
             event = events[state[1], state[2]]
-            if "BET" in events[state[1], state[2]]:
+            if "BET" in event:
                 result[event][hand] = node.strategy_[Action.BET3BB]
                 result[event[0] + "ALLIN"][hand] = node.strategy_[Action.ALLIN]
                 result[event[0] + "CALL"][hand] = node.strategy_[Action.CALL]
@@ -79,72 +335,57 @@ class GameWrapper:
 
         return result
 
-    def evaluation(self, game, player):
-        reward = sum(game.bets.values())
-        p1 = game.players[player]
-        p2 = game.players[1 - player]
-        if len(game.player_list.rotation) == 1:
-            return reward - game.bets[p1.uuid] if game.player_list.rotation[0].uuid == p1.uuid \
-                else -game.bets[p1.uuid]
-
-        pair1 = Card.get_rank_int(p1.cards[0]) == Card.get_rank_int(p1.cards[1])
-        pair2 = Card.get_rank_int(p2.cards[0]) == Card.get_rank_int(p2.cards[1])
-        higher1 = Card.get_rank_int(p1.cards[1]) > Card.get_rank_int(p2.cards[1])
-        higher2 = Card.get_rank_int(p1.cards[0]) > Card.get_rank_int(p2.cards[0])
-        equal1 = Card.get_rank_int(p1.cards[1]) == Card.get_rank_int(p2.cards[1])
-        equal2 = Card.get_rank_int(p1.cards[0]) == Card.get_rank_int(p2.cards[0])
-        equal = equal1 and equal2
-        higher = higher1 or (equal1 and higher2)
-
-        if (pair1 and not pair2) or (pair1 and pair2 and higher) \
-                or (not pair1 and not pair2 and higher):
-            return reward - game.bets[p1.uuid]
-        elif equal:
-            return (reward / 2) - game.bets[p1.uuid]
-        else:
-            return -game.bets[p1.uuid]
+    def evaluation(self, state, player):
+        """
+        Chips won by a player at a terminal state, showdowns pay out the expected share of the pot
+        """
+        reward = sum(state.bets)
+        if len(state.rotation) == 1:
+            return reward - state.bets[player] if state.rotation[0] == player \
+                else -state.bets[player]
+        return reward * float(self.equity[self.combos[player], self.combos[1 - player]]) - state.bets[player]
 
-    def cfr(self, actions, game, p1, p2, player):
+    def cfr(self, state, p1, p2, player):
         probability_weight = p1 if player == 0 else p2
+        instrumentation.count('cfr.nodes')
 
         # Check if state is terminal
-        if game.player_list.visited_all():
+        if state.is_terminal():
             # Direct payout
-            return self.evaluation(game, player)
+            return self.evaluation(state, player)
 
         # Current game state
-        state = self.hole_card_state(game, game.player_list.rotation[player])
-        if state in self.game_states:
-            node = self.game_states[state]  # Get our node if it already exists
+        key = self.info_set(state, player)
+        if key in self.game_states:
+            node = self.game_states[key]  # Get our node if it already exists
             actions = node.actions_
         else:
             # Create new Node with possible actions we can perform
-            node = Node(actions)
-            self.game_states[state] = node
+            node = Node(state.actions, self.table)
+            self.game_states[key] = node
+            instrumentation.count('cfr.infosets')
+            actions = node.actions_
 
         strategy = node.get_strategy(probability_weight)
-        util = dict()
+        util = [0.0] * len(actions)
         node_util = 0
         # for each of our possible actions, compute the utility of it
         # thus, finding the overall utility of this current state
-        for action in actions:
-            next_game = game.copy()  # Duplicate game
-            next_actions = next_game.step_bets([x for x in actions], action)  # Make action
+        for i, action in enumerate(actions):
+            state.apply(action)  # Make action
 
             if player == 0:
-                util[action] = -self.cfr(next_actions, next_game, p1 * strategy[action], p2, 1)
+                util[i] = -self.cfr(state, p1 * strategy[i], p2, 1)
             else:
-                util[action] = -self.cfr(next_actions, next_game, p1, p2 * strategy[action], 0)
+                util[i] = -self.cfr(state, p1, p2 * strategy[i], 0)
+
+            state.undo()  # Take it back before trying the next one
 
-            node_util += strategy[action] * util[action]
+            node_util += strategy[i] * util[i]
 
         # compute regret and update Game State for the node based on utility of all actions
-        for action in actions:
-            regret = util[action] - node_util
-            if player == 0:
-                node.regret_sum_[action] += regret * p2
-            else:
-                node.regret_sum_[action] += regret * p1
+        weight = p2 if player == 0 else p1
+        node.add_regret([(value - node_util) * weight for value in util])
 
         return node_util
 
@@ -154,9 +395,62 @@ class GameWrapper:
         game.player_list = PlayerList(game.players)
         game.reset_bets()
         game.deal_cards()
+        self.hand_classes = [hand_class(player.cards) for player in game.players]
+        self.combos = [combos.combo_index(player.cards) for player in game.players]
 
-        game.history = {player.uuid: [] for player in game.players}
+        game.reset_history()
         game.step_blind(False)  # Small blind
         game.step_blind(True)  # Big Blind
 
         return [Action.FOLD, Action.CALL] + game.BET_ACTIONS  # First round allows players to respond to blinds
+
+
+def _pack_random(states):
+    """
+    Mersenne Twister states of the random module as arrays
+    :return: [n, 625] internal state and the n cached gaussians (nan if there is none)
+    """
+    internal = np.array([state[1] for state in states], dtype=np.uint32)
+    gauss = np.array([np.nan if state[2] is None else state[2] for state in states])
+    return internal, gauss
+
+
+def _unpack_random(internal, gauss):
+    """
+    Inverse of _pack_random
+    """
+    return [(3, tuple(row), None if np.isnan(g) else float(g)) for row, g in zip(internal.tolist(), gauss.tolist())]
+
+
+def plot_utility(steps, utils, path):
+    import matplotlib.pyplot as plt  # Only loaded when plotting, compute workers never pay for it
+
+    plt.plot(steps, utils)
+    plt.xlabel('iteration')
+    plt.ylabel('average utility')
+    plt.savefig(path)
+
+
+_worker = None
+
+
+def _init_worker(equity=None):
+    global _worker
+    _worker = GameWrapper(equity)
+
+
+def _train_worker(task):
+    """
+    Continue a deal stream for a number of iterations against a snapshot of the table
+    :return: Increments to the snapshot's sums, the utility and the new state of the stream
+    """
+    snapshot, stream, iterations = task
+    _worker.restore(snapshot)
+    random.setstate(stream)
+    util = _worker.iterate(iterations)
+
+    deltas = _worker.snapshot()
+    rows = len(snapshot['keys'])
+    deltas['regret_sum'][:rows] -= snapshot['regret_sum']
+    deltas['strategy_sum'][:rows] -= snapshot['strategy_sum']
+    return deltas, util, random.getstate()
@@ -0,0 +1,109 @@
+import numpy as np
+from treys import Card
+from game.Action import Action
+
+N_HAND_CLASSES = 169  # Canonical preflop hands: 13 pairs, 78 suited and 78 offsuit
+N_ACTION_IDS = len(Action)
+
+# Labels used when decoding a history for debugging, blinds are left out
+ACTION_LABELS = {Action.FOLD: "F", Action.CHECK: "X", Action.CALL: "C", Action.BET1BB: "",
+                 Action.BET3BB: "B", Action.BET4BB: "B4", Action.BET5BB: "B5", Action.ALLIN: "AI"}
+ACTIONS_BY_ID = {action.id: action for action in Action}
+
+
+def hand_class(cards):
+    """
+    Index of the canonical preflop class of two hole cards on a 13x13 grid.
+    Suited hands sit below the diagonal, offsuit hands and pairs on or above it.
+    :param cards: Two treys card integers
+    :return: Integer in [0, 169)
+    """
+    low, high = Card.get_rank_int(cards[0]), Card.get_rank_int(cards[1])
+    if low > high:
+        low, high = high, low
+    if Card.get_suit_int(cards[0]) == Card.get_suit_int(cards[1]):
+        return high * 13 + low
+    return low * 13 + high
+
+
+def hand_classes(cards):
+    """
+    Vectorised hand_class
+    :param cards: [..., 2] treys card integers
+    :return: [...] integers in [0, 169)
+    """
+    ranks, suits = (cards >> 8) & 0xF, (cards >> 12) & 0xF
+    low, high = ranks.min(axis=-1), ranks.max(axis=-1)
+    return np.where(suits[..., 0] == suits[..., 1], high * 13 + low, low * 13 + high)
+
+
+def hand_class_str(index):
+    """
+    Inverse of hand_class, lowest rank first, e.g. '8Qo' or '2As'
+    """
+    row, col = divmod(index, 13)
+    if row > col:
+        return Card.STR_RANKS[col] + Card.STR_RANKS[row] + 's'
+    return Card.STR_RANKS[row] + Card.STR_RANKS[col] + 'o'
+
+
+class InfoSetEncoder:
+    """
+    Packs a betting history and the acting player's hand class into a single integer.
+    The history id is extended by one digit per action so it can be maintained in O(1).
+    """
+    def __init__(self, n_seats):
+        """
+        :param n_seats: Number of players seated at the table
+        """
+        self.n_seats = n_seats
+        self.base = n_seats * N_ACTION_IDS + 1  # Digit 0 is reserved so leading actions are never lost
+
+    def extend(self, history_id, seat, action):
+        """
+        :param history_id: Id of the history so far, 0 for an empty history
+        :param seat: Position of the acting player
+        :param action: Action.py
+        :return: Id of the history with the action appended
+        """
+        return history_id * self.base + seat * N_ACTION_IDS + action.id + 1
+
+    def key(self, history_id, seat, cls):
+        """
+        :return: Information set of the player at seat holding a hand of class cls
+        """
+        return (history_id * self.n_seats + seat) * N_HAND_CLASSES + cls
+
+    def split(self, key):
+        """
+        :return: (history_id, seat, hand class) encoded in an information set key
+        """
+        rest, cls = divmod(key, N_HAND_CLASSES)
+        history_id, seat = divmod(rest, self.n_seats)
+        return history_id, seat, cls
+
+    def actions(self, history_id):
+        """
+        :return: List of (seat, action) in the order they were taken
+        """
+        result = []
+        while history_id > 0:
+            history_id, digit = divmod(history_id, self.base)
+            seat, action_id = divmod(digit - 1, N_ACTION_IDS)
+            result.append((seat, ACTIONS_BY_ID[action_id]))
+        return result[::-1]
+
+    def decode(self, key, uuids=None):
+        """
+        Debugging view of an information set in the legacy string format
+        :param key: Information set key
+        :param uuids: Identifier of the player at each seat, defaults to the seat
+        :return: (hand, player, actions) e.g. ('8Qo', 1, "['C', 'B']")
+        """
+        history_id, seat, cls = self.split(key)
+        acts = [[] for _ in range(self.n_seats)]
+        for actor, action in self.actions(history_id):
+            if action != Action.BET1BB:
+                acts[actor].append(ACTION_LABELS[action])
+        player = seat if uuids is None else uuids[seat]
+        return hand_class_str(cls), player, str([','.join(x) for x in acts])
@@ -3,6 +3,12 @@ class PlayerList:
     Mutable object that reflects the number of players involved in a game
     """
     def __init__(self, players):
+        self.reset(players)
+
+    def reset(self, players):
+        """
+        Start a new hand with the given players
+        """
         self.rotation = [x for x in players]
         self.pos = 0
         self.visited = 0
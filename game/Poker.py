@@ -1,7 +1,9 @@
-from treys import Card, Evaluator, Deck
+from treys import Card, Deck
 from game.PlayerList import PlayerList
 from game.Action import Action
-from game.View import PygletWindow, BLACK, GREEN, BLUE
+from game.InfoSet import InfoSetEncoder
+from game.Showdown import Showdown
+from util import instrumentation
 import numpy as np
 import time
 
@@ -10,8 +12,9 @@ class Poker:
     MAX_RAISES = 1  # Maximum number of times a player can raise / bet in a round
     # BET_ACTIONS = [Action.BET1BB, Action.BET3BB, Action.BET4BB, Action.BET5BB, Action.ALLIN]
     BET_ACTIONS = [Action.BET3BB, Action.ALLIN]
+    showdown = None  # Showdown shared by every game, its tables are built on the first showdown
 
-    def __init__(self, participants, big_blind, starting_stack, log=False, display=False):
+    def __init__(self, participants, big_blind, starting_stack, log=False, display=False, hand_history=None):
         """
         No Limit Texas Hold'em Engine powered by 'treys'
 
@@ -20,8 +23,10 @@ class Poker:
         :param log: Whether or not to show the actions taken in the game in the console
         :param display: Whether or not to show the actions taken in the game in graphical format
         :param participants: List of players in the game
+        :param hand_history: HandHistory every hand is written to
         """
         self.log = log
+        self.hand_history = hand_history
         self.display = display
         self.big_blind = big_blind
         self.players = [x for x in participants]
@@ -34,12 +39,16 @@ class Poker:
         self.all_in = False
         self.bet_count = self.MAX_RAISES
         self.player_list = PlayerList(self.players)
-        self.history = {player.uuid: [] for player in self.players}
+        self.encoder = InfoSetEncoder(len(self.players))
+        self.history = {}
+        self.reset_history()
         self.bets = {}
         self.viewer = None
 
     def display_game(self):
         """Display the current state of the game using pyglet"""
+        from game.View import PygletWindow, BLACK, GREEN, BLUE  # Headless games never load pyglet
+
         if self.viewer is None:
             self.viewer = PygletWindow(650, 450)
         self.viewer.reset()
@@ -82,6 +91,28 @@ class Poker:
     def reset_bets(self):
         self.bets = {player.uuid: 0 for player in self.players}
 
+    def reset_history(self):
+        """
+        Clear the actions of the previous hand and fix the seat of each player for the next
+        """
+        if self.history.keys() == {player.uuid for player in self.players}:
+            for actions in self.history.values():
+                actions.clear()
+        else:
+            self.history = {player.uuid: [] for player in self.players}
+        self.history_id = 0
+        self.seats = {player.uuid: i for i, player in enumerate(self.players)}
+
+    def record_action(self, player, action, amount):
+        """
+        Append an action to the history of the hand
+        :param player: Player taking the action
+        :param action: Action.py
+        :param amount: Number of chips bet
+        """
+        self.history[player.uuid].append((action, amount))
+        self.history_id = self.encoder.extend(self.history_id, self.seats[player.uuid], action)
+
     def rotate_button(self):
         """
         Move the responsibility of posting the big-blind
@@ -93,9 +124,13 @@ class Poker:
         Reset the deck and deal cards for a new hand
         """
         self.deck.shuffle()
+        if self.hand_history is not None:
+            self.hand_history.start_hand(self.big_blind)
         for player in self.players:
             # Texas Hold'em gives each player 2 cards.
             player.set_cards(self.deck.draw(2))
+            if self.hand_history is not None:
+                self.hand_history.deal(player)
 
             if self.display:
                 self.display_game()
@@ -112,6 +147,8 @@ class Poker:
             self.board += self.deck.draw(n)
         else:
             self.board.append(self.deck.draw(1))
+        if self.hand_history is not None:
+            self.hand_history.board(self.board[-n:])
 
         if self.display:
             self.display_game()
@@ -119,41 +156,43 @@ class Poker:
         if self.log:
             print(Card.print_pretty_cards(self.board))
 
-    def calculate_winner(self):
+    def calculate_winners(self):
         """
-        Determin the winner of a hand using smart encodings supplied by treys
-        :param players: Remaining players in the game
+        Determine the players sharing the pot, every remaining hand is ranked against the board at once
+        :return: Remaining players holding the best hand
         """
         if len(self.player_list) <= 1:  # Only check for winners if necessary
-            return self.player_list.rotation[0]
+            return self.player_list.rotation[:1]
 
-        evaluator = Evaluator()
-        best = (None, float('inf'))
+        if Poker.showdown is None:
+            Poker.showdown = Showdown()
+        players = self.player_list.rotation
+        ranks = Poker.showdown.rank([player.cards for player in players], self.board)
 
-        for player in self.player_list.rotation:
-            card_eval = evaluator.evaluate(self.board, player.cards)
-            if self.display:
-                self.display_game()
-            if self.log:
-                print(Card.print_pretty_cards(player.cards),
-                      evaluator.class_to_string(evaluator.get_rank_class(card_eval)))
-            if card_eval < best[1]:
-                best = (player, card_eval)
+        if self.display:
+            self.display_game()
+        if self.log:
+            for player, rank, place in zip(players, ranks, Showdown.ranking(ranks)):
+                print(Card.print_pretty_cards(player.cards), Poker.showdown.describe(rank), "place", place + 1)
 
-        return best[0]
+        best = min(ranks)
+        return [player for player, rank in zip(players, ranks) if rank == best]
 
-    def get_game_state(self, player, history):
+    def get_game_state(self, player, history, seat=None):
         """
         Summarises the game in a dictionary. Needs work...
         :param player: Index of current player
         :param history: All actions in the given hand
+        :param seat: Seat of the current player in the information set encoding
         :return: All available information in the game
         """
         assert player < len(self.players)
         return {
             "board": self.board,
             "history": history,
-            "position": player
+            "position": player,
+            "history_id": self.history_id,
+            "seat": seat
         }
 
     def get_amount(self, player, action):
@@ -170,14 +209,17 @@ class Poker:
 
         action = Action.BET1BB
         amount = self.big_blind / (1 if is_big else 2)
-        self.history[player.uuid].append((action, amount))
+        self.record_action(player, action, amount)
         self.bets[player.uuid] += amount
+        if self.hand_history is not None:
+            self.hand_history.action(player, action, amount)
         self.player_list.visited = 0  # Blinds can bet again on top of their stake
         player.add_stack(-amount)
 
         return action, amount
 
     def copy(self):
+        instrumentation.count('poker.copies')
         game = Poker(self.players, self.big_blind, 0)
         game.deck.cards = [x for x in self.deck.cards]
         game.board = [x for x in self.board]
@@ -185,6 +227,8 @@ class Poker:
         game.bet_count = self.bet_count
         game.player_list = self.player_list.duplicate()
         game.history = {k: [i for i in v] for k, v in self.history.items()}
+        game.history_id = self.history_id
+        game.seats = self.seats
         game.bets = {k: v for k, v in self.bets.items()}
         return game
 
@@ -194,15 +238,17 @@ class Poker:
 
         if action is None:
             action = player.act(self.get_game_state(
-                ind, self.history), avail_actions)
+                ind, self.history, self.seats[player.uuid]), avail_actions)
         amount = self.get_amount(player, action)
         if amount >= player.stack:
             action = Action.CALL if self.all_in else Action.ALLIN
 
-        self.history[player.uuid].append((action, amount))
+        self.record_action(player, action, amount)
         if action == Action.FOLD:
             # player is not participating in this hand
             self.player_list.remove(player)
+            if self.hand_history is not None:
+                self.hand_history.action(player, action, 0)
             return avail_actions
 
         # If a player raises or calls, we calculate the remainder they need to pay.
@@ -212,6 +258,8 @@ class Poker:
         # player.add_stack(-amount)
 
         self.bets[player.uuid] += amount
+        if self.hand_history is not None:
+            self.hand_history.action(player, action, amount)
 
         if action != Action.CALL and action != Action.CHECK:
             self.bet_count -= 1
@@ -250,14 +298,18 @@ class Poker:
     def play_round(self):
         """
         Executes a hand of poker
+        :return: Chips won minus chips bet by each player, keyed by uuid
         """
         pot = 0
         self.all_in = False
-        self.player_list = PlayerList(self.players)
+        self.player_list.reset(self.players)
+        paid = {player.uuid: 0 for player in self.players}
         self.reset_bets()
-        self.deal_cards()
+        instrumentation.count('poker.hands')
+        with instrumentation.timer('poker.deal'):
+            self.deal_cards()
 
-        self.history = {player.uuid: [] for player in self.players}
+        self.reset_history()
         self.step_blind(False)  # Small blind
         self.step_blind(True)  # Big Blind
 
@@ -267,7 +319,10 @@ class Poker:
             if self.all_in:  # No more betting to take place
                 self.comm_cards(k)
                 continue
-            pot += self.betting_round(avail_actions)
+            with instrumentation.timer('poker.betting_round'):
+                pot += self.betting_round(avail_actions)
+            for uuid, amount in self.bets.items():
+                paid[uuid] += amount
             avail_actions = [Action.FOLD, Action.CHECK] + self.BET_ACTIONS
             self.reset_bets()
 
@@ -276,14 +331,23 @@ class Poker:
 
             self.comm_cards(k)  # Reveal cards after each betting round
 
-        winner = self.calculate_winner()
-        winner.add_stack(pot)
+        with instrumentation.timer('poker.showdown'):
+            winners = self.calculate_winners()
+        share = pot / len(winners)  # Ties split the pot
+        for winner in winners:
+            winner.add_stack(share)
+            paid[winner.uuid] -= share
+            if self.hand_history is not None:
+                self.hand_history.win(winner, share)
 
         if self.display:
             self.display_game()
         if self.log:
-            print(winner.uuid, "wins with" +
-                  Card.print_pretty_cards(winner.cards))
+            for winner in winners:
+                print(winner.uuid, "wins with" +
+                      Card.print_pretty_cards(winner.cards))
+
+        return {uuid: -amount for uuid, amount in paid.items()}
 
     def play_game(self, n):
         """
@@ -303,5 +367,6 @@ class Poker:
 
                 if self.display:
                     self.display_game()
-                print(player.uuid, player.stack)
+                if self.log:
+                    print(player.uuid, player.stack)
             n -= 1
@@ -0,0 +1,66 @@
+from treys import Evaluator
+from util.evaluator import evaluate_cards
+import numpy as np
+
+
+class Showdown:
+    """
+    Ranks every live hand of a showdown against the shared board in one pass.
+    Five card hands use the tables of treys with the prime product of the board
+    computed once, longer hands go through the vectorised util.evaluator.
+    Build it once per process, creating the treys tables takes milliseconds.
+    """
+    def __init__(self):
+        self.evaluator = Evaluator()
+        self.flushes = self.evaluator.table.flush_lookup
+        self.unsuited = self.evaluator.table.unsuited_lookup
+
+    def rank(self, hands, board):
+        """
+        :param hands: Hole cards of each player as pairs of treys card integers
+        :param board: Treys card integers
+        :return: List of hand ranks, lower is stronger
+        """
+        if len(board) != 3:
+            return evaluate_cards([list(hand) + list(board) for hand in hands]).tolist()
+
+        # A flush needs five distinct ranks, so its prime product is the product of the card primes
+        suit = board[0] & board[1] & board[2] & 0xF000
+        prime = (board[0] & 0xFF) * (board[1] & 0xFF) * (board[2] & 0xFF)
+        return [(self.flushes if suit & first & second else self.unsuited)[prime * (first & 0xFF) * (second & 0xFF)]
+                for first, second in hands]
+
+    @staticmethod
+    def ranking(ranks):
+        """
+        :param ranks: Hand ranks, lower is stronger
+        :return: Place of each hand, 0 for the best, equal hands share a place
+        """
+        return [sum(other < rank for other in ranks) for rank in ranks]
+
+    def winners(self, hands, board):
+        """
+        :return: Indices of the hands sharing the pot
+        """
+        ranks = self.rank(hands, board)
+        best = min(ranks)
+        return [i for i, rank in enumerate(ranks) if rank == best]
+
+    def describe(self, rank):
+        """
+        :return: Name of the class of a hand rank, e.g. 'Two Pair'
+        """
+        return self.evaluator.class_to_string(self.evaluator.get_rank_class(rank))
+
+
+def batch_winners(hands, boards, live):
+    """
+    Showdowns of many tables in one vectorised call
+    :param hands: [tables, players, 2] treys card integers
+    :param boards: [tables, n] treys card integers, n from 3 to 5
+    :param live: [tables, players] players still in the hand
+    :return: [tables, players] mask of the players sharing each pot
+    """
+    cards = np.concatenate([hands, np.broadcast_to(boards[:, None, :], hands.shape[:2] + boards.shape[1:])], axis=2)
+    ranks = np.where(live, evaluate_cards(cards), np.iinfo(np.int64).max)
+    return ranks == ranks.min(axis=1, keepdims=True)
@@ -0,0 +1,105 @@
+from game.Poker import Poker
+from game.HandHistory import HandHistory
+from multiprocessing import Pool
+import numpy as np
+import os
+import random
+import sys
+import time
+
+
+class Simulator:
+    """
+    Plays independent hands of Poker across a process pool without any output and
+    aggregates the chips won by each player. Every hand starts from full stacks so
+    results are not cut short by players busting.
+    """
+    def __init__(self, create_players, big_blind=2, starting_stack=200, seed=0):
+        """
+        :param create_players: Picklable function returning a fresh list of players, e.g. a module level function
+        :param big_blind: Cost of playing a hand
+        :param starting_stack: Number of chips each player holds at the start of every hand
+        :param seed: Seed of the deal streams, results do not depend on the number of workers
+        """
+        self.create_players = create_players
+        self.big_blind = big_blind
+        self.starting_stack = starting_stack
+        self.seed = seed
+
+    def run(self, hands, workers=None, chunk=10000, strict=True, history=None):
+        """
+        :param hands: Number of hands to play
+        :param workers: Number of processes, defaults to the number of cores
+        :param chunk: Hands played by a task, each task deals from its own seeded stream
+        :param strict: Discard anything the players write to stdout
+        :param history: Prefix of the binary hand histories, task i appends to '<history>.<i>' (see game.HandHistory)
+        :return: Dictionary of the results (see summarise)
+        """
+        tasks = [min(chunk, hands - start) for start in range(0, hands, chunk)]
+        seeds = np.random.SeedSequence(self.seed).spawn(len(tasks))
+        paths = [None if history is None else "%s.%i" % (history, i) for i in range(len(tasks))]
+        start = time.perf_counter()
+        with Pool(workers or os.cpu_count(), initializer=_init_worker,
+                  initargs=(self.create_players, self.big_blind, self.starting_stack, strict)) as pool:
+            results = pool.map(_play_worker, [(seed.generate_state(1)[0], n, path)
+                                              for seed, n, path in zip(seeds, tasks, paths)])
+        return self.summarise(results, hands, time.perf_counter() - start)
+
+    def summarise(self, results, hands, duration, z=1.96):
+        """
+        :param results: Per task sums of the net big blinds and of their squares, keyed by uuid
+        :param z: Standard score of the confidence interval, 1.96 for 95%
+        :return: {'hands', 'seconds', 'hands_per_sec', 'players': {uuid: {'bb/100', 'ci'}}},
+                 the confidence interval is the half width in big blinds per 100 hands
+        """
+        players = {}
+        for uuid in results[0]:
+            total = sum(result[uuid][0] for result in results)
+            squares = sum(result[uuid][1] for result in results)
+            mean = total / hands
+            stderr = np.sqrt(max(squares / hands - mean ** 2, 0.0) / max(hands - 1, 1))
+            players[uuid] = {'bb/100': 100 * mean, 'ci': 100 * z * stderr}
+        return {'hands': hands, 'seconds': duration, 'hands_per_sec': hands / duration, 'players': players}
+
+    @staticmethod
+    def report(summary):
+        print("%i hands in %.1f s (%.0f hands/sec)" % (summary['hands'], summary['seconds'],
+                                                       summary['hands_per_sec']))
+        for uuid, result in sorted(summary['players'].items()):
+            print("Player %s: %+.2f +/- %.2f bb/100" % (uuid, result['bb/100'], result['ci']))
+
+
+_worker = None
+
+
+def _init_worker(create_players, big_blind, starting_stack, strict):
+    global _worker
+    if strict:
+        sys.stdout = open(os.devnull, 'w')
+    _worker = (create_players, big_blind, starting_stack)
+
+
+def _play_worker(task):
+    """
+    Play hands from a seeded stream of deals and decisions
+    :return: Sums of the net big blinds and of their squares of each player, keyed by uuid
+    """
+    seed, hands, history = task
+    create_players, big_blind, starting_stack = _worker
+    random.seed(int(seed))
+    np.random.seed(seed)
+
+    game = Poker(create_players(), big_blind, starting_stack,
+                 hand_history=None if history is None else HandHistory(history))
+    sums = {player.uuid: [0.0, 0.0] for player in game.players}
+    for _ in range(hands):
+        for player in game.players:
+            player.add_stack(starting_stack - player.stack)
+        for uuid, net in game.play_round().items():
+            sums[uuid][0] += net / big_blind
+            sums[uuid][1] += (net / big_blind) ** 2
+        game.board = []
+        game.rotate_button()
+    if game.hand_history is not None:
+        game.hand_history.close()
+    return sums
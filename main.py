@@ -2,9 +2,8 @@ from game.Poker import *
 from agents.EquityPlayer import *
 from agents.RandomPlayer import *
 from game.GameWrapper import *
+from game.Simulator import Simulator
 import json
-import matplotlib.pyplot as plt
-from matplotlib.table import Table
 
 
 def run_game():
@@ -21,9 +20,21 @@ def run_game():
     game.play_game(100)
 
 
+def random_table():
+    return [EquityPlayer(1), RandomPlayer(2), RandomPlayer(3), RandomPlayer(4), RandomPlayer(5), RandomPlayer(6)]
+
+
+def run_simulation():
+    simulator = Simulator(random_table, big_blind=10, starting_stack=1000)
+    Simulator.report(simulator.run(100000))
+
+
 def create_ranges():
+    import matplotlib.pyplot as plt
+    from matplotlib.table import Table
+
     cfr = GameWrapper()
-    util = cfr.train(5000000)
+    util = cfr.solve(2000)
 
     label = ['A', 'K', 'Q', 'J', 'T', '9', '8', '7', '6', '5', '4', '3', '2']
     rank_index_map = {
@@ -86,6 +97,7 @@ def create_ranges():
     result = cfr.get_strategy()
     with open('strategy.json', 'w') as stream:
         print(json.dumps(result), file=stream)
+    cfr.export_strategy('strategy.npy')  # Played by agents.StrategyPlayer
 
     for decision in sorted(result):
         table = create_table(decision, result[decision])
@@ -94,7 +106,10 @@ def create_ranges():
 
 
 if __name__ == '__main__':
+    from util.equity import load_equity
     # run_game()
+    # run_simulation()  # Headless, on every core
     # wrap = GameWrapper()
     # util = wrap.train(100000)
+    # wrap = GameWrapper(load_equity())  # Computes the exact showdown equity offline if it is not cached yet
     create_ranges()
@@ -0,0 +1,104 @@
+import numpy as np
+import pytest
+from treys import Deck
+from agents.EquityPlayer import EquityPlayer
+from agents.Player import Player
+from game.BatchPoker import BatchPoker
+from game.Poker import Poker
+from util.EquityCache import EquityCache
+
+
+class ScriptedPlayer(Player):
+    """
+    Takes the same decisions in both engines: the k-th decision at a table picks
+    the available action given by the k-th of the table's uniform numbers
+    """
+    def __init__(self, uuid, choices):
+        """
+        :param choices: [tables, decisions] uniform numbers in [0, 1)
+        """
+        super(ScriptedPlayer, self).__init__(uuid)
+        self.choices = choices
+        self.counts = np.zeros(len(choices), dtype=np.int64)
+        self.table = 0  # Table played by act
+
+    def act(self, game_state, actions_avail):
+        choice = self.choices[self.table, self.counts[self.table]]
+        self.counts[self.table] += 1
+        return actions_avail[int(choice * len(actions_avail))]
+
+    def act_batch(self, states, legal_mask):
+        tables = states["table"]
+        choice = (self.choices[tables, self.counts[tables]] * legal_mask.sum(axis=1)).astype(np.int64)
+        self.counts[tables] += 1
+        return (np.cumsum(legal_mask, axis=1) > choice[:, None]).argmax(axis=1)
+
+
+def scalar_round(players, big_blind, stacks, deck):
+    """
+    Poker.play_round with a fixed deck and starting stacks
+    :return: Net chips of each player and the history id of the hand
+    """
+    game = Poker(players, big_blind, 0)
+    for player, stack in zip(players, stacks):
+        player.add_stack(stack - player.stack)
+    game.deck.shuffle = lambda: setattr(game.deck, 'cards', list(deck))
+    results = game.play_round()
+    return [results[player.uuid] for player in players], game.history_id
+
+
+def differences(batch_players, scalar_players, n_tables, big_blind=2):
+    """
+    Plays the same decks and stacks with BatchPoker and with Poker, short random stacks
+    make forced all-ins common
+    :param batch_players: Players seated at BatchPoker
+    :param scalar_players: Players seated at Poker, in the same order
+    :return: Tables where the engines disagree on the net chips or the history id, tables with a split pot
+    """
+    decks = np.array(Deck.GetFullDeck())[np.argsort(np.random.random((n_tables, 52)), axis=1)]
+    stacks = np.random.randint(1, 30, size=(n_tables, len(batch_players)))
+    batch = BatchPoker(batch_players, big_blind, n_tables)
+    nets = batch.play_round(stacks, decks)
+
+    history_ids = batch.history_ids()
+    wrong = []
+    for table in range(n_tables):
+        for player in scalar_players:
+            player.table = table
+        net, history_id = scalar_round(scalar_players, big_blind, stacks[table].tolist(), decks[table].tolist())
+        if not (np.allclose(net, nets[table]) and history_id == history_ids[table]):
+            wrong.append(table)
+    return wrong, np.flatnonzero(batch.winners.sum(axis=1) > 1)
+
+
+def scripted(choices, seats):
+    """
+    Players taking the same decisions in both engines, one per seat
+    """
+    return [ScriptedPlayer(i + 1, choices[i]) for i in seats]
+
+
+@pytest.mark.parametrize("n_players", range(2, 7))
+def test_vectorised_policies_match_poker(n_players):
+    np.random.seed(n_players)
+    n_tables = 2000
+    choices = np.random.random((n_players, n_tables, 4 * n_players))
+    seats = range(n_players)
+    wrong, split = differences(scripted(choices, seats), scripted(choices, seats), n_tables)
+    assert wrong == []
+    assert len(split) > 0
+
+
+@pytest.mark.parametrize("n_players", [2, 4, 6])
+def test_default_act_batch_matches_poker(n_players):
+    np.random.seed(10 + n_players)
+    n_tables = 200
+    # Scripted opponents are seeded alike in both engines, the equity player shares its cache
+    # between them so both see the same estimate of every spot
+    choices = np.random.random((n_players, n_tables, 4 * n_players))
+    equity = EquityPlayer(1, iters=200, cache=EquityCache())
+    seats = range(1, n_players)
+    batch_players = [equity] + scripted(choices, seats)
+    scalar_players = [equity] + scripted(choices, seats)
+    wrong, _ = differences(batch_players, scalar_players, n_tables)
+    assert wrong == []
@@ -0,0 +1,35 @@
+import os
+import random
+import numpy as np
+import pytest
+from game.GameWrapper import GameWrapper
+from util import combos
+
+ITERATIONS = 800  # Half of it is a whole number of merges of two workers with sync_interval 100
+
+
+def train(iterations, seed=0, **kwargs):
+    random.seed(seed)
+    wrapper = GameWrapper(combos.heuristic_equity())
+    util = wrapper.train(iterations, print_interval=10 ** 9, plot_path=None, **kwargs)
+    return wrapper, util
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_resume_reproduces_uninterrupted_run(tmp_path, workers):
+    options = dict(workers=workers, sync_interval=100, update_rule='dcfr', discount_interval=100)
+    full, full_util = train(ITERATIONS, **options)
+    full_random = random.random()
+
+    path = os.path.join(str(tmp_path), 'checkpoint.npz')
+    train(ITERATIONS // 2, checkpoint_path=path, checkpoint_interval=ITERATIONS // 2, **options)
+    # A different seed shows the random state comes from the checkpoint
+    resumed, resumed_util = train(ITERATIONS, seed=1, resume_from=path, **options)
+
+    assert resumed_util == full_util
+    assert resumed.iteration == full.iteration
+    assert random.random() == full_random
+    expected, actual = full.snapshot(), resumed.snapshot()
+    assert expected.keys() == actual.keys()
+    for name in expected:
+        assert np.array_equal(expected[name], actual[name]), name
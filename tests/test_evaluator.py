@@ -0,0 +1,29 @@
+import numpy as np
+import pytest
+from treys import Deck, Evaluator
+from util.evaluator import evaluate_cards
+
+HANDS = 2000
+
+
+def random_hands(rng, n_cards, deck):
+    return np.array(deck)[np.argsort(rng.random((HANDS, len(deck))), axis=1)[:, :n_cards]]
+
+
+def treys_ranks(hands):
+    evaluator = Evaluator()
+    return np.array([evaluator.evaluate(hand[:2], hand[2:]) for hand in hands.tolist()])
+
+
+@pytest.mark.parametrize("n_cards", [5, 6, 7])
+def test_matches_treys(n_cards):
+    hands = random_hands(np.random.default_rng(n_cards), n_cards, Deck.GetFullDeck())
+    assert np.array_equal(evaluate_cards(hands), treys_ranks(hands))
+
+
+@pytest.mark.parametrize("n_cards", [5, 6, 7])
+def test_matches_treys_on_flushes(n_cards):
+    # Two suits make flushes and straight flushes common
+    deck = [card for card in Deck.GetFullDeck() if (card >> 12) & 0xF in (1, 2)]
+    hands = random_hands(np.random.default_rng(10 + n_cards), n_cards, deck)
+    assert np.array_equal(evaluate_cards(hands), treys_ranks(hands))
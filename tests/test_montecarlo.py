@@ -0,0 +1,38 @@
+import numpy as np
+import pytest
+from util import montecarlo
+from util.montecarlo import Evaluation
+
+ACE_KING = dict(card1=[14, 0], card2=[13, 0], tablecards=[], player_amount=2)
+
+
+@pytest.mark.parametrize("thresholds", [(), None])
+def test_adaptive_without_thresholds_samples_to_the_limit(thresholds):
+    np.random.seed(0)
+    estimate = Evaluation().run_adaptive(thresholds=thresholds, max_samples=2000, **ACE_KING)
+    assert estimate.samples == 2000
+
+
+def test_adaptive_stops_once_thresholds_are_excluded():
+    np.random.seed(0)
+    estimate = Evaluation().run_adaptive(thresholds=(0.1,), max_samples=2000, **ACE_KING)
+    assert estimate.samples < 2000
+    assert abs(estimate.equity - 0.1) > 2.58 * estimate.stderr
+
+
+@pytest.mark.parametrize("iterations, chunk_size", [(1000, 8192), (5000, 1024), (3000, 1000)])
+def test_batch_equity_respects_chunk_size(monkeypatch, iterations, chunk_size):
+    deals = []
+
+    def recording(holes, known, lengths, opponents, iterations):
+        deals.append(len(holes) * iterations)
+        return batch_wins(holes, known, lengths, opponents, iterations)
+
+    batch_wins = montecarlo._batch_wins
+    monkeypatch.setattr(montecarlo, '_batch_wins', recording)
+    np.random.seed(0)
+    holes = [[[14, 0], [14, 1]], [[7, 2], [2, 3]], [[13, 0], [12, 0]]]
+    equity = montecarlo.batch_equity(holes, [[], [], [[11, 0], [10, 0], [2, 1]]], [1, 1, 2], iterations, chunk_size)
+    assert max(deals) <= chunk_size
+    assert sum(deals) == len(holes) * iterations
+    assert equity[0] > 0.75 and equity[1] < 0.4
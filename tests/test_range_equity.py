@@ -0,0 +1,59 @@
+from itertools import combinations
+import numpy as np
+import pytest
+from treys import Card, Evaluator
+from util import combos
+from util.RangeEquity import RangeEquity
+
+
+def cards(*names):
+    return [Card.new(name) for name in names]
+
+
+def pair_range(names, rng=None):
+    """
+    Every combo of the given cards, uniformly weighted or with random weights
+    """
+    weights = np.zeros(combos.N_COMBOS)
+    for pair in combinations(cards(*names), 2):
+        weights[combos.combo_index(pair)] = 1.0 if rng is None else rng.random()
+    return weights
+
+
+def brute_force(hero, villain, board):
+    """
+    Equity of each hero combo by dealing every compatible villain combo and runout
+    :return: [1326] equity, nan where the hero combo faces no villain weight
+    """
+    evaluator = Evaluator()
+    deck = combos.deck().tolist()
+    holes = combos.combo_cards().tolist()
+    equity = np.full(combos.N_COMBOS, np.nan)
+    for h in np.flatnonzero(hero):
+        won = total = 0.0
+        for v in np.flatnonzero(villain):
+            used = set(holes[h]) | set(holes[v]) | set(board)
+            if len(used) < 4 + len(board):
+                continue
+            left = [card for card in deck if card not in used]
+            for rest in combinations(left, 5 - len(board)):
+                runout = board + list(rest)
+                mine, theirs = evaluator.evaluate(holes[h], runout), evaluator.evaluate(holes[v], runout)
+                won += villain[v] * (1.0 if mine < theirs else 0.5 if mine == theirs else 0.0)
+                total += villain[v]
+        if total > 0:
+            equity[h] = won / total
+    return equity
+
+
+@pytest.mark.parametrize("board", [cards('Kd', '9h', '2c', 'Qs'), cards('Kd', '9h', '2c')])
+def test_card_removal_matches_brute_force(board):
+    # The ranges share cards with each other, and the villain's with the board
+    hero = pair_range(['As', 'Ks', 'Kh', 'Qd', 'Jc'])
+    villain = pair_range(['As', 'Kh', 'Td', '9c', '9h', 'Qd', '2s'], np.random.default_rng(0))
+    expected = brute_force(hero, villain, board)
+    actual = RangeEquity().equity(villain, board)
+
+    rows = np.flatnonzero(hero)
+    assert np.array_equal(np.isnan(actual[rows]), np.isnan(expected[rows]))
+    assert np.allclose(actual[rows], expected[rows], equal_nan=True, rtol=0, atol=1e-12)
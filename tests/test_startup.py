@@ -0,0 +1,25 @@
+import os
+import subprocess
+import sys
+import time
+from multiprocessing import get_context
+import pytest
+
+HEAVY = ['pyglet', 'matplotlib', 'torch']
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.mark.parametrize("module", ['game.Poker', 'game.GameWrapper', 'game.Simulator'])
+def test_import_leaves_out_heavy_modules(module):
+    code = "import sys, %s; print(','.join(m for m in %r if m in sys.modules))" % (module, HEAVY)
+    output = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True,
+                            cwd=ROOT).stdout
+    assert output.strip() == ''
+
+
+def test_spawned_workers_start_quickly():
+    # Workers importing the engine answered in about 0.4 s, 1.4 s while matplotlib was loaded at import
+    start = time.perf_counter()
+    with get_context('spawn').Pool(2, initializer=__import__, initargs=('game.Simulator',)) as pool:
+        assert pool.map(abs, [-1, -2]) == [1, 2]
+    assert time.perf_counter() - start < 5
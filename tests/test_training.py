@@ -0,0 +1,54 @@
+import random
+import numpy as np
+from game.GameState import GameState
+from game.GameWrapper import GameWrapper
+from util import combos
+
+
+def tables_equal(first, second):
+    first, second = first.snapshot(), second.snapshot()
+    return first.keys() == second.keys() and all(np.array_equal(first[name], second[name]) for name in first)
+
+
+def test_single_worker_matches_serial_loop():
+    iterations = 300
+    random.seed(0)
+    trained = GameWrapper(combos.heuristic_equity())
+    util = trained.train(iterations, print_interval=10 ** 9, workers=1, plot_path=None)
+
+    # The loop train ran before it supported several workers
+    random.seed(0)
+    serial = GameWrapper(combos.heuristic_equity())
+    total = 0.0
+    for _ in range(iterations):
+        game = serial.game.copy()
+        actions = serial.start_game(game)
+        total += serial.cfr(GameState(game, actions), 1, 1, 0)
+    assert util == total / iterations
+    assert tables_equal(trained, serial)
+
+
+def test_train_without_iterations():
+    for workers in [1, 2]:
+        assert GameWrapper(combos.heuristic_equity()).train(0, workers=workers, plot_path=None) == 0.0
+
+
+def test_fewer_iterations_than_workers():
+    wrapper = GameWrapper(combos.heuristic_equity())
+    wrapper.train(1, workers=2, plot_path=None)
+    assert len(wrapper.table) > 0
+
+
+def sampled_exploitability(rule, iterations=8000, seed=0):
+    random.seed(seed)
+    wrapper = GameWrapper(combos.heuristic_equity())
+    wrapper.train(iterations, print_interval=10 ** 9, update_rule=rule, plot_path=None)
+    return wrapper.exploitability(), wrapper.iteration
+
+
+def test_discounting_rules_beat_vanilla_on_sampled_deals():
+    vanilla, _ = sampled_exploitability('vanilla')
+    for rule in ['linear', 'dcfr']:
+        exploitability, steps = sampled_exploitability(rule)
+        assert steps == 8  # One discounting step per 1000 deals
+        assert exploitability < vanilla
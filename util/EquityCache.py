@@ -0,0 +1,76 @@
+import sys
+from collections import OrderedDict
+from itertools import permutations
+from treys import Card
+
+SUIT_PERMUTATIONS = list(permutations(range(4)))
+
+
+class EquityCache:
+    """
+    Bounded LRU cache of equity estimates. Spots that only differ by a relabelling of
+    the suits or by the order of the cards share an entry.
+    """
+    def __init__(self, max_bytes=32 * 2 ** 20):
+        """
+        :param max_bytes: Approximate memory used by keys and values before the least
+                          recently used entries are evicted
+        """
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def canonical(cards):
+        """
+        Smallest relabelling of the suits of a spot
+        :param cards: Groups of treys card integers whose order does not matter, e.g. (hole cards, board)
+        :return: Tuple of sorted tuples of rank * 4 + suit
+        """
+        groups = [[(Card.get_rank_int(card), Card.get_suit_int(card).bit_length() - 1) for card in group]
+                  for group in cards]
+        return min(tuple(tuple(sorted(rank * 4 + permutation[suit] for rank, suit in group)) for group in groups)
+                   for permutation in SUIT_PERMUTATIONS)
+
+    def key(self, hole_cards, board, n_players, iters, *args):
+        return (n_players, iters) + args + self.canonical((hole_cards, board))
+
+    @staticmethod
+    def entry_size(key, value):
+        return sys.getsizeof(key) + sum(sys.getsizeof(item) for item in key) + sys.getsizeof(value)
+
+    def get(self, hole_cards, board, n_players, iters, evaluate, *args):
+        """
+        Cached equity of a spot
+        :param evaluate: Called with (hole_cards, board, n_players, iters, *args) on a miss, e.g. EquityPlayer.eval_hand
+        :param args: Further hashable arguments of evaluate, part of the key
+        """
+        key = self.key(hole_cards, board, n_players, iters, *args)
+        if key in self.entries:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return self.entries[key]
+
+        self.misses += 1
+        value = evaluate(hole_cards, board, n_players, iters, *args)
+        self.entries[key] = value
+        self.bytes += self.entry_size(key, value)
+        while self.bytes > self.max_bytes and self.entries:
+            old_key, old_value = self.entries.popitem(last=False)
+            self.bytes -= self.entry_size(old_key, old_value)
+            self.evictions += 1
+        return value
+
+    def clear(self):
+        self.entries.clear()
+        self.bytes = 0
+
+    def stats(self):
+        """
+        :return: Counters of the cache as a dictionary
+        """
+        return {"entries": len(self.entries), "bytes": self.bytes, "hits": self.hits,
+                "misses": self.misses, "evictions": self.evictions}
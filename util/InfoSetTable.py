@@ -0,0 +1,122 @@
+import numpy as np
+
+
+class InfoSetTable:
+    """
+    Contiguous store for the regret and strategy sums of every information set.
+    Row i holds information set i and column j the j-th action available there.
+    """
+    def __init__(self, width, capacity=1024):
+        """
+        :param width: Largest number of actions available at any information set
+        :param capacity: Number of rows to allocate up front, grows as required
+        """
+        self.width = width
+        self.size = 0
+        self.regret_sum = np.zeros((capacity, width))
+        self.strategy = np.zeros((capacity, width))
+        self.strategy_sum = np.zeros((capacity, width))
+        self.actions = np.full((capacity, width), -1, dtype=np.int8)  # Action.id of each column
+        self.n_actions = np.zeros(capacity, dtype=np.int8)
+
+    def __len__(self):
+        return self.size
+
+    def to_arrays(self):
+        """
+        :return: Copies of the used rows of every array, keyed by attribute name
+        """
+        return {name: getattr(self, name)[:self.size].copy()
+                for name in ['regret_sum', 'strategy', 'strategy_sum', 'actions', 'n_actions']}
+
+    @classmethod
+    def from_arrays(cls, arrays):
+        """
+        Inverse of to_arrays
+        """
+        size, width = arrays['actions'].shape
+        table = cls(width, capacity=max(size, 1))
+        for name, values in arrays.items():
+            getattr(table, name)[:size] = values
+        table.size = size
+        return table
+
+    def _grow(self):
+        capacity = 2 * len(self.n_actions)
+        for name in ['regret_sum', 'strategy', 'strategy_sum', 'actions', 'n_actions']:
+            old = getattr(self, name)
+            new = np.zeros((capacity,) + old.shape[1:], dtype=old.dtype)
+            if name == 'actions':
+                new.fill(-1)
+            new[:self.size] = old[:self.size]
+            setattr(self, name, new)
+
+    def add(self, action_ids):
+        """
+        Allocate a row for a new information set
+        :param action_ids: Action.id of each action available in the information set
+        :return: Index of the new row
+        """
+        if self.size == len(self.n_actions):
+            self._grow()
+        index = self.size
+        self.actions[index, :len(action_ids)] = action_ids
+        self.n_actions[index] = len(action_ids)
+        self.size += 1
+        return index
+
+    def regret_matching(self, index, realization_weight):
+        """
+        Update the current strategy of a row from its positive regrets
+        and accumulate it into the strategy sum. A single row only holds a few actions,
+        so the arithmetic is done on Python floats rather than paying for numpy calls.
+        :param index: Row of the information set
+        :param realization_weight: Probability of the acting player reaching the information set
+        :return: The current strategy of the row as a list
+        """
+        n = int(self.n_actions[index])
+        strategy = [regret if regret > 0 else 0.0 for regret in self.regret_sum[index].tolist()[:n]]
+        normalizing_sum = sum(strategy)
+        if normalizing_sum > 0:
+            strategy = [probability / normalizing_sum for probability in strategy]
+        else:
+            strategy = [1.0 / n] * n
+
+        self.strategy[index, :n] = strategy
+        self.strategy_sum[index, :n] = [total + realization_weight * probability for total, probability
+                                        in zip(self.strategy_sum[index].tolist(), strategy)]
+        return strategy
+
+    def regret_matching_all(self):
+        """
+        Recompute the current strategy of every row at once
+        """
+        regrets = np.maximum(self.regret_sum[:self.size], 0.0)
+        normalizing_sum = regrets.sum(axis=1, keepdims=True)
+        uniform = (self.actions[:self.size] >= 0) / self.n_actions[:self.size, None]
+        self.strategy[:self.size] = np.where(
+            normalizing_sum > 0, regrets / np.where(normalizing_sum > 0, normalizing_sum, 1), uniform)
+        return self.strategy[:self.size]
+
+    def discount(self, positive, negative, strategy):
+        """
+        Scale the cumulative sums of every row, see util.update_rules
+        :param positive: Factor for positive regrets
+        :param negative: Factor for negative regrets
+        :param strategy: Factor for the strategy sums
+        """
+        regrets = self.regret_sum[:self.size]
+        regrets *= np.where(regrets > 0, positive, negative)
+        self.strategy_sum[:self.size] *= strategy
+
+    def average_strategy(self, index=None):
+        """
+        Normalised strategy sums, uniform where a row was never reached
+        :param index: Row of the information set, or None for the whole table
+        """
+        rows = slice(0, self.size) if index is None else index
+        strategy_sum = self.strategy_sum[rows]
+        normalizing_sum = strategy_sum.sum(axis=-1, keepdims=True)
+        uniform = (self.actions[rows] >= 0) / np.maximum(self.n_actions[rows], 1)[..., None]
+        return np.where(normalizing_sum > 0, strategy_sum / np.where(normalizing_sum > 0, normalizing_sum, 1),
+                        uniform)
@@ -1,48 +1,54 @@
+from util.InfoSetTable import InfoSetTable
+
+
 class Node():
-    def __init__(self, actions):
+    """
+    View of a single information set stored in an InfoSetTable
+    """
+    def __init__(self, actions, table=None, index=None):
+        """
+        :param actions: Actions available in the information set
+        :param table: InfoSetTable holding the node, a private one is created if not supplied
+        :param index: Existing row of the node in the table, a new row is added if not supplied
+        """
+        if table is None:
+            table = InfoSetTable(len(actions), capacity=1)
         self.actions_ = actions
-        self.regret_sum_ = dict()
-        self.strategy_ = dict()
-        self.strategy_sum_ = dict()
-
-        for action in actions:
-            self.regret_sum_[action] = 0.0
-            self.strategy_[action] = 0.0
-            self.strategy_sum_[action] = 0.0
+        self.table_ = table
+        self.index_ = table.add([action.id for action in actions]) if index is None else index
 
     def __str__(self):
         return str(self.strategy_)
 
-    def get_strategy(self, realization_weight):
-        normalizing_sum = 0
+    def _as_dict(self, values):
+        return {action: values[self.index_, i] for i, action in enumerate(self.actions_)}
 
-        for action in self.actions_:
-            self.strategy_[action] = (
-                self.regret_sum_[action] if self.regret_sum_[action] > 0
-                else 0)
-            normalizing_sum += self.strategy_[action]
+    @property
+    def regret_sum_(self):
+        return self._as_dict(self.table_.regret_sum)
 
-        for action in self.actions_:
-            if normalizing_sum > 0:
-                self.strategy_[action] /= normalizing_sum
-            else:
-                self.strategy_[action] = 1.0 / len(self.actions_)
+    @property
+    def strategy_(self):
+        return self._as_dict(self.table_.strategy)
 
-            self.strategy_sum_[action] += realization_weight * self.strategy_[action]
+    @property
+    def strategy_sum_(self):
+        return self._as_dict(self.table_.strategy_sum)
 
-        return self.strategy_
+    def get_strategy(self, realization_weight):
+        """
+        :return: Current strategy as a list aligned with actions_
+        """
+        return self.table_.regret_matching(self.index_, realization_weight)
+
+    def add_regret(self, regrets):
+        """
+        :param regrets: List of regrets aligned with actions_
+        """
+        regret_sum = self.table_.regret_sum
+        regret_sum[self.index_, :len(self.actions_)] = [total + regret for total, regret
+                                                        in zip(regret_sum[self.index_].tolist(), regrets)]
 
     def get_average_strategy(self):
-        average_strategy = {}
-        normalizing_sum = 0
-
-        for action in self.actions_:
-            normalizing_sum += self.strategy_sum_[action]
-
-        for action in self.actions_:
-            if normalizing_sum > 0:
-                average_strategy[action] = self.strategy_sum_[action] / normalizing_sum
-            else:
-                average_strategy[action] = 1.0 / len(self.actions_)
-
-        return average_strategy
+        average_strategy = self.table_.average_strategy(self.index_)
+        return {action: average_strategy[i] for i, action in enumerate(self.actions_)}
@@ -0,0 +1,87 @@
+import random
+import numpy as np
+from game.GameState import GameState
+from util import combos
+
+
+class PublicNode:
+    """
+    Node of the betting tree as seen by an observer who cannot see any hole cards
+    """
+    def __init__(self, state):
+        """
+        :param state: GameState positioned at this node
+        """
+        self.history_id = state.history_id
+        self.terminal = state.is_terminal()
+        self.bets = list(state.bets)
+        self.rotation = list(state.rotation)
+        self.seat = None if self.terminal else state.to_act()
+        self.actions = [] if self.terminal else state.actions
+        self.children = []
+
+    def payoff(self, seat):
+        """
+        Chips won by a seat if the hand ends here, None if it goes to showdown
+        """
+        if len(self.rotation) > 1:
+            return None
+        reward = sum(self.bets)
+        return reward - self.bets[seat] if self.rotation[0] == seat else -self.bets[seat]
+
+    def terminal_values(self, seats, opponent_reach, showdown):
+        """
+        Counterfactual value of every combo of some seats at a terminal node
+        :param seats: Seats to evaluate
+        :param opponent_reach: [1326] probability of each opponent combo reaching the node, one per seat
+        :param showdown: [1326, 1326] equity of the row combo against the column combo, see combos.showdown_equity
+        :return: [1326] values, one per seat
+        """
+        unblocked = [combos.unblocked(reach) for reach in opponent_reach]
+        if self.payoff(seats[0]) is not None:
+            return [self.payoff(seat) * unblocked[i] for i, seat in enumerate(seats)]
+
+        reward = sum(self.bets)
+        wins = showdown @ np.stack(opponent_reach, axis=1)
+        return [reward * wins[:, i] - self.bets[seat] * unblocked[i] for i, seat in enumerate(seats)]
+
+
+class PublicTree:
+    """
+    Every betting sequence reachable from a GameState, independent of the cards dealt
+    """
+    def __init__(self, state):
+        """
+        :param state: GameState at the first decision of the hand
+        """
+        self.root = self._build(state)
+
+    @classmethod
+    def from_wrapper(cls, wrapper):
+        """
+        Tree of the hands trained by a GameWrapper, the random module is left untouched
+        """
+        random_state = random.getstate()
+        game = wrapper.game.copy()
+        actions = wrapper.start_game(game)
+        random.setstate(random_state)
+        return cls(GameState(game, actions))
+
+    def _build(self, state):
+        node = PublicNode(state)
+        if not node.terminal:
+            for action in node.actions:
+                state.apply(action)
+                node.children.append(self._build(state))
+                state.undo()
+        return node
+
+    def nodes(self):
+        """
+        Decision and terminal nodes in depth first order
+        """
+        stack = [self.root]
+        while stack:
+            node = stack.pop()
+            yield node
+            stack.extend(reversed(node.children))
@@ -0,0 +1,201 @@
+from collections import OrderedDict
+from itertools import combinations
+
+import numpy as np
+
+from game.InfoSet import hand_class_str
+from util import combos
+from util.evaluator import lookup_tables, POWERS, BITS, N_SUITS
+
+
+class RangeEquity:
+    """
+    Showdown equity of hands and weighted ranges against weighted opponent ranges on a board.
+    Ranges are [1326] weights over the combos of util.combos. The ranks of every combo on
+    every runout of a board are cached, card removal is handled by inclusion-exclusion over
+    the 51 combos holding each card instead of a [1326, 1326] compatibility matrix.
+    """
+    def __init__(self, preflop=None, max_boards=32, chunk=32):
+        """
+        :param preflop: [1326, 1326] equity matrix used before the flop, e.g. util.equity.load_equity()
+        :param max_boards: Boards whose runout ranks are kept
+        :param chunk: Runouts compared at once
+        """
+        self.preflop = preflop
+        self.max_boards = max_boards
+        self.chunk = chunk
+        self.boards = OrderedDict()
+
+        cards = combos.combos()
+        self.hole_keys = POWERS[cards // 4].sum(axis=1)
+        self.hole_bits = np.stack([np.where(cards % 4 == suit, BITS[cards // 4], 0).sum(axis=1)
+                                   for suit in range(N_SUITS)], axis=1)
+        # Combos holding each card, 51 per card
+        self.card_combos = np.array([np.nonzero(combos.card_masks()[:, card])[0] for card in range(combos.N_CARDS)])
+        # Position of each combo among the combos of its first and second card
+        self.slots = np.stack([np.nonzero(self.card_combos[cards[:, card]] == np.arange(combos.N_COMBOS)[:, None])[1]
+                               for card in range(2)], axis=1)
+
+    @staticmethod
+    def board_indices(board):
+        """
+        :param board: Treys card integers
+        :return: Sorted tuple of indices into combos.deck()
+        """
+        indices = combos.card_indices()
+        return tuple(sorted(indices[card] for card in board))
+
+    def ranks(self, board):
+        """
+        Rank of every combo on every way to complete the board, cached per board
+        :param board: Tuple of 3 to 5 card indices
+        :return: [runouts, 1326] treys ranks, lower is stronger, and [runouts, 1326] combos not sharing a card
+        """
+        if board in self.boards:
+            self.boards.move_to_end(board)
+            return self.boards[board]
+
+        left = [card for card in range(combos.N_CARDS) if card not in board]
+        runouts = np.array([board + rest for rest in combinations(left, 5 - len(board))], dtype=np.int64)
+        keys, values, flushes = lookup_tables()
+        board_keys = POWERS[runouts // 4].sum(axis=1)
+        index = np.searchsorted(keys, board_keys[:, None] + self.hole_keys[None, :])
+        ranks = values[np.minimum(index, len(keys) - 1)]  # Combos sharing a board card get a meaningless rank
+        for suit in range(N_SUITS):
+            board_bits = np.where(runouts % 4 == suit, BITS[runouts // 4], 0).sum(axis=1)
+            ranks = np.minimum(ranks, flushes[board_bits[:, None] | self.hole_bits[None, :, suit]])
+        valid = ~combos.card_masks()[:, runouts].any(axis=2).T
+
+        self.boards[board] = (ranks.astype(np.int16), valid)
+        if len(self.boards) > self.max_boards:
+            self.boards.popitem(last=False)
+        return self.boards[board]
+
+    def totals(self, villain, board):
+        """
+        Villain weight each hero combo beats, ties and faces, summed over the runouts
+        :param villain: [1326] weights of the opponent's combos
+        :param board: Tuple of 3 to 5 card indices
+        :return: Three [1326] arrays (wins, ties, total)
+        """
+        all_ranks, all_valid = self.ranks(board)
+        wins, ties, total = np.zeros(combos.N_COMBOS), np.zeros(combos.N_COMBOS), np.zeros(combos.N_COMBOS)
+        holes = combos.combos()
+        for start in range(0, len(all_ranks), self.chunk):
+            ranks, valid = all_ranks[start:start + self.chunk], all_valid[start:start + self.chunk]
+            weights = villain * valid
+
+            # Every combo of the opponent
+            beaten, tied, all_weight = weaker_and_tied(ranks, weights)
+
+            # Minus the combos sharing a card with the hero combo, the combo itself shares both
+            width = self.card_combos.shape[1]
+            shared = weaker_and_tied(ranks[:, self.card_combos].reshape(-1, width),
+                                     weights[:, self.card_combos].reshape(-1, width))
+            shared_beaten, shared_tied, shared_weight = (array.reshape(len(ranks), combos.N_CARDS, -1)
+                                                         for array in shared)
+            for card in range(2):
+                beaten = beaten - shared_beaten[:, holes[:, card], self.slots[:, card]]
+                tied = tied - shared_tied[:, holes[:, card], self.slots[:, card]]
+                all_weight = all_weight - shared_weight[:, holes[:, card], 0]
+            tied += weights
+            all_weight += weights
+
+            wins += (beaten * valid).sum(axis=0)
+            ties += (tied * valid).sum(axis=0)
+            total += (all_weight * valid).sum(axis=0)
+        return wins, ties, total
+
+    def outcomes(self, villain, board=()):
+        """
+        :param villain: [1326] weights of the opponent's combos
+        :param board: Treys card integers, none or 3 to 5
+        :return: [1326] equity of every hero combo, nan for combos that cannot face the range,
+                 and [1326] villain weight each combo faces
+        """
+        villain = np.asarray(villain, dtype=np.float64)
+        if len(board) == 0:
+            assert self.preflop is not None, "Preflop equity needs the equity matrix"
+            compatible = combos.compatibility()
+            wins, total = (self.preflop * compatible) @ villain, compatible @ villain
+        else:
+            board = self.board_indices(board)
+            wins, ties, total = self.totals(villain * ~combos.card_masks()[:, board].any(axis=1), board)
+            wins = wins + ties / 2
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(total > 0, wins / total, np.nan), total
+
+    def equity(self, villain, board=()):
+        """
+        Equity of every hero combo against a range
+        :param villain: [1326] weights of the opponent's combos
+        :param board: Treys card integers, none or 3 to 5
+        :return: [1326] probability of winning plus half the probability of a split,
+                 nan for combos that cannot face the range
+        """
+        return self.outcomes(villain, board)[0]
+
+    def range_equity(self, hero, villain, board=()):
+        """
+        Equity of a weighted range against another, pairs of combos are weighted by both ranges
+        :param hero: [1326] weights of the hero's combos
+        """
+        equity, total = self.outcomes(villain, board)
+        weights = np.asarray(hero, dtype=np.float64) * total
+        reachable = weights > 0
+        return float((equity[reachable] * weights[reachable]).sum() / weights[reachable].sum())
+
+    def hand_equity(self, cards, villain, board=()):
+        """
+        Equity of hole cards against a range
+        :param cards: Two treys card integers
+        """
+        return float(self.equity(villain, board)[combos.combo_index(cards)])
+
+
+def weaker_and_tied(ranks, weights):
+    """
+    Weight of the entries of a group ranked weaker than and equal to each entry, every group at once
+    :param ranks: [n, m] ranks of n groups of m entries, lower is stronger
+    :param weights: [n, m] weight of each entry
+    :return: [n, m] weaker weight, [n, m] tied weight (the entry included) and [n, 1] total weight of each group
+    """
+    n, m = ranks.shape
+    rows, positions = np.arange(n)[:, None], np.arange(m)
+    order = np.argsort(ranks, axis=1)
+    sorted_ranks = np.take_along_axis(ranks, order, axis=1)
+    sorted_weights = np.take_along_axis(weights, order, axis=1)
+    cumulative = np.cumsum(sorted_weights, axis=1)
+
+    # First and last position of the block of equal ranks each position belongs to
+    boundary = sorted_ranks[:, 1:] != sorted_ranks[:, :-1]
+    first = np.maximum.accumulate(np.where(np.pad(boundary, ((0, 0), (1, 0)), constant_values=True),
+                                           positions, 0), axis=1)
+    last = np.minimum.accumulate(np.where(np.pad(boundary, ((0, 0), (0, 1)), constant_values=True),
+                                          positions, m)[:, ::-1], axis=1)[:, ::-1]
+    at_most = cumulative[rows, last]
+    below = cumulative[rows, first] - sorted_weights[rows, first]
+
+    total = cumulative[:, -1:]
+    result = np.empty((2, n, m))
+    np.put_along_axis(result, np.broadcast_to(order, (2, n, m)), np.stack((total - at_most, at_most - below)), axis=2)
+    return result[0], result[1], total
+
+
+def combo_range(cards):
+    """
+    Range holding only the given hole cards
+    """
+    weights = np.zeros(combos.N_COMBOS)
+    weights[combos.combo_index(cards)] = 1.0
+    return weights
+
+
+def class_range(frequencies):
+    """
+    Range from weights of preflop hand classes, e.g. one of the charts of GameWrapper.get_strategy
+    :param frequencies: Map from class string (game.InfoSet.hand_class_str) to weight, or [169] weights
+    """
+    if isinstance(frequencies, dict):
+        frequencies = np.array([frequencies.get(hand_class_str(cls), 0.0) for cls in range(169)])
+    return np.asarray(frequencies, dtype=np.float64)[combos.combo_classes()]
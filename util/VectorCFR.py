@@ -0,0 +1,86 @@
+import numpy as np
+from game.InfoSet import N_HAND_CLASSES
+from util.Node import Node
+from util.PublicTree import PublicTree
+from util.update_rules import get_update_rule
+from util import combos
+
+
+class VectorCFR:
+    """
+    CFR over the public betting tree carrying a reach probability for every one of the
+    1326 hole card combinations of both players. A single traversal updates every
+    information set of the game, terminal values are matrix-vector products.
+    """
+    def __init__(self, wrapper, equity=None):
+        """
+        :param wrapper: GameWrapper whose information sets are solved, heads-up only
+        :param equity: [1326, 1326] showdown equity of the row combo against the column combo,
+                       defaults to the matrix of the wrapper
+        """
+        assert len(wrapper.players) == 2, "Vector CFR supports heads-up play only"
+        self.tree = PublicTree.from_wrapper(wrapper)
+        self.wrapper = wrapper
+        self.table = wrapper.table
+
+        self.showdown = combos.showdown_equity(wrapper.equity if equity is None else equity)
+        self.class_of = combos.combo_classes()
+        self.class_sum = combos.class_sums()
+
+        self.rows = {}  # Table row of each hand class at every decision node
+        for node in self.tree.nodes():
+            if not node.terminal:
+                self.rows[node] = np.array([self._row(node, cls) for cls in range(N_HAND_CLASSES)])
+        self.table.regret_matching_all()
+
+    def _row(self, node, cls):
+        key = self.wrapper.game.encoder.key(node.history_id, node.seat, cls)
+        if key not in self.wrapper.game_states:
+            self.wrapper.game_states[key] = Node(node.actions, self.table)
+        return self.wrapper.game_states[key].index_
+
+    def terminal_values(self, node, reach):
+        """
+        :return: Counterfactual value of each combo for both seats
+        """
+        return node.terminal_values([0, 1], [reach[1], reach[0]], self.showdown)
+
+    def cfr(self, node, reach):
+        """
+        :param node: PublicNode
+        :param reach: Probability of each seat's combos reaching the node
+        :return: Counterfactual value of each combo for both seats
+        """
+        if node.terminal:
+            return self.terminal_values(node, reach)
+
+        seat = node.seat
+        rows = self.rows[node]
+        n = len(node.actions)
+        strategy = self.table.strategy[rows, :n][self.class_of]
+
+        values = [np.zeros(combos.N_COMBOS), np.zeros(combos.N_COMBOS)]
+        action_values = np.empty((combos.N_COMBOS, n))
+        for i, child in enumerate(node.children):
+            child_reach = list(reach)
+            child_reach[seat] = reach[seat] * strategy[:, i]
+            child_values = self.cfr(child, child_reach)
+
+            action_values[:, i] = child_values[seat]
+            values[seat] += strategy[:, i] * child_values[seat]
+            values[1 - seat] += child_values[1 - seat]
+
+        self.table.regret_sum[rows, :n] += self.class_sum @ (action_values - values[seat][:, None])
+        self.table.strategy_sum[rows, :n] += self.class_sum @ (reach[seat][:, None] * strategy)
+        return values
+
+    def iterate(self, rule=None):
+        """
+        One simultaneous update of every information set
+        :param rule: Name or instance of a util.update_rules rule, vanilla CFR by default
+        :return: Expected value of the first seat under the current strategies
+        """
+        values = self.cfr(self.tree.root, [np.ones(combos.N_COMBOS), np.ones(combos.N_COMBOS)])
+        self.wrapper.discount(get_update_rule(rule))
+        self.table.regret_matching_all()
+        return values[0].sum() / combos.N_DEALS
@@ -1,3 +1,6 @@
+from util.update_rules import get_update_rule
+from util import exploitability as best_response
+
 A = 1
 
 
@@ -25,13 +28,16 @@ def init_empty_node_maps(node, output=None):
 
 class CounterfactualRegretMinimizationBase:
 
-    def __init__(self, root, chance_sampling=False):
+    def __init__(self, root, chance_sampling=False, update_rule=None):
         self.root = root
         self.sigma = init_sigma(root)
         self.cumulative_regrets = init_empty_node_maps(root)
         self.cumulative_sigma = init_empty_node_maps(root)
         self.nash_equilibrium = init_empty_node_maps(root)
         self.chance_sampling = chance_sampling
+        # 'vanilla', 'cfr+', 'linear', 'dcfr' or an instance from util.update_rules
+        self.update_rule = get_update_rule(update_rule)
+        self.iteration = 0
 
     def _update_sigma(self, i):
         rgrt_sum = sum(filter(lambda x : x > 0, self.cumulative_regrets[i].values()))
@@ -55,6 +61,18 @@ class CounterfactualRegretMinimizationBase:
         for k in node.children:
             self.__compute_ne_rec(node.children[k])
 
+    def _discount(self):
+        # called once at the end of every iteration, scales the cumulative regrets and sigmas
+        self.iteration += 1
+        if self.update_rule.is_vanilla():
+            return
+        positive, negative, strategy = self.update_rule.discounts(self.iteration)
+        for i in self.cumulative_regrets:
+            for a, regret in self.cumulative_regrets[i].items():
+                self.cumulative_regrets[i][a] = regret * (positive if regret > 0 else negative)
+            for a in self.cumulative_sigma[i]:
+                self.cumulative_sigma[i][a] *= strategy
+
     def _cumulate_cfr_regret(self, information_set, action, regret):
         self.cumulative_regrets[information_set][action] += regret
 
@@ -64,6 +82,11 @@ class CounterfactualRegretMinimizationBase:
     def run(self, iterations):
         raise NotImplementedError("Please implement run method")
 
+    def exploitability(self):
+        # average gain of a best response against the nash equilibrium approximation, in game units
+        self.compute_nash_equilibrium()
+        return best_response.exploitability(self.root, self.nash_equilibrium, A)
+
     def value_of_the_game(self):
         return self.__value_of_the_game_state_recursive(self.root)
 
@@ -119,12 +142,13 @@ class CounterfactualRegretMinimizationBase:
 
 class VanillaCFR(CounterfactualRegretMinimizationBase):
 
-    def __init__(self, root):
-        super().__init__(root = root, chance_sampling = False)
+    def __init__(self, root, update_rule = None):
+        super().__init__(root = root, chance_sampling = False, update_rule = update_rule)
 
     def run(self, iterations = 1):
         for _ in range(0, iterations):
             self._cfr_utility_recursive(self.root, 1, 1)
+            self._discount()
             # since we do not update sigmas in each information set while traversing, we need to
             # traverse the tree to perform to update it now
             self.__update_sigma_recursively(self.root)
@@ -143,9 +167,14 @@ class VanillaCFR(CounterfactualRegretMinimizationBase):
 
 class ChanceSamplingCFR(CounterfactualRegretMinimizationBase):
 
-    def __init__(self, root):
-        super().__init__(root = root, chance_sampling = True)
+    def __init__(self, root, update_rule = None):
+        super().__init__(root = root, chance_sampling = True, update_rule = update_rule)
 
     def run(self, iterations = 1):
         for _ in range(0, iterations):
-            self._cfr_utility_recursive(self.root, 1, 1)
\ No newline at end of file
+            self._cfr_utility_recursive(self.root, 1, 1)
+            self._discount()
+            if not self.update_rule.is_vanilla():
+                # sigma was updated during the traversal, refresh it from the discounted regrets
+                for i in self.cumulative_regrets:
+                    self._update_sigma(i)
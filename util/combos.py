@@ -0,0 +1,131 @@
+from functools import lru_cache
+import numpy as np
+from treys import Card, Deck
+from game.InfoSet import hand_class, N_HAND_CLASSES
+
+N_CARDS = 52
+N_COMBOS = 1326  # Distinct pairs of hole cards
+N_DEALS = N_COMBOS * (N_COMBOS - 2 * N_CARDS + 3)  # Ordered pairs of combos sharing no card
+
+
+@lru_cache(maxsize=None)
+def deck():
+    """
+    :return: The 52 treys card integers in ascending order
+    """
+    return np.array(sorted(Deck.GetFullDeck()), dtype=np.int64)
+
+
+@lru_cache(maxsize=None)
+def card_indices():
+    """
+    :return: Mapping from treys card integer to its position in deck()
+    """
+    return {card: i for i, card in enumerate(deck().tolist())}
+
+
+@lru_cache(maxsize=None)
+def combos():
+    """
+    :return: [1326, 2] array of card indices, lowest card first
+    """
+    first, second = np.triu_indices(N_CARDS, k=1)
+    return np.stack((first, second), axis=1)
+
+
+def combo_index(cards):
+    """
+    :param cards: Two treys card integers
+    :return: Row of the hand in combos()
+    """
+    indices = card_indices()
+    i, j = sorted((indices[cards[0]], indices[cards[1]]))
+    # Rows before i hold 51 + 50 + ... + (52 - i) combos
+    return i * (2 * N_CARDS - i - 1) // 2 + (j - i - 1)
+
+
+@lru_cache(maxsize=None)
+def combo_cards():
+    """
+    :return: [1326, 2] array of the treys card integers of each combo
+    """
+    return deck()[combos()]
+
+
+@lru_cache(maxsize=None)
+def combo_classes():
+    """
+    :return: Canonical preflop class (game.InfoSet.hand_class) of each combo
+    """
+    return np.array([hand_class(cards) for cards in combo_cards().tolist()], dtype=np.int64)
+
+
+@lru_cache(maxsize=None)
+def card_masks():
+    """
+    :return: [1326, 52] boolean array of the cards held by each combo
+    """
+    masks = np.zeros((N_COMBOS, N_CARDS), dtype=bool)
+    masks[np.arange(N_COMBOS)[:, None], combos()] = True
+    return masks
+
+
+@lru_cache(maxsize=None)
+def class_sums():
+    """
+    :return: [169, 1326] float array, 1 where the column combo belongs to the row hand class.
+             Multiplying by it sums values over the combos of each class.
+    """
+    class_sum = np.zeros((N_HAND_CLASSES, N_COMBOS))
+    class_sum[combo_classes(), np.arange(N_COMBOS)] = 1.0
+    return class_sum
+
+
+@lru_cache(maxsize=None)
+def _float_masks():
+    return card_masks().astype(np.float64)
+
+
+def unblocked(reach):
+    """
+    Opponent reach summed over the combos sharing no card with each combo, by inclusion-exclusion
+    over the cards of the combo
+    :param reach: [1326] weight of each opponent combo
+    :return: [1326] total weight of the opponent combos each combo can be dealt against
+    """
+    masks = _float_masks()
+    return reach.sum() - masks @ (masks.T @ reach) + reach
+
+
+def showdown_equity(equity):
+    """
+    :param equity: [1326, 1326] showdown equity of the row combo
+    :return: The equity with the pairs of combos that cannot be dealt together zeroed
+    """
+    return equity * compatibility()
+
+
+@lru_cache(maxsize=None)
+def compatibility():
+    """
+    :return: [1326, 1326] float array, 1 where two combos share no card
+    """
+    masks = card_masks().astype(np.float64)
+    return (masks @ masks.T == 0).astype(np.float64)
+
+
+@lru_cache(maxsize=None)
+def heuristic_equity():
+    """
+    Showdown rule of GameWrapper.evaluation for every pair of combos: pairs beat
+    unpaired hands, otherwise the higher top card and then the higher low card wins.
+    :return: [1326, 1326] array of 1 (win), 0.5 (split) or 0 (loss) for the row combo
+    """
+    ranks = np.array([[Card.get_rank_int(card) for card in cards] for cards in combo_cards().tolist()])
+    low, high = ranks.min(axis=1), ranks.max(axis=1)
+    pair = low == high
+    higher = (high[:, None] > high[None, :]) | ((high[:, None] == high[None, :]) & (low[:, None] > low[None, :]))
+    equal = (high[:, None] == high[None, :]) & (low[:, None] == low[None, :])
+    win = (pair[:, None] & ~pair[None, :]) | (pair[:, None] & pair[None, :] & higher) \
+        | (~pair[:, None] & ~pair[None, :] & higher)
+    return np.where(win, 1.0, np.where(equal, 0.5, 0.0))
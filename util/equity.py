@@ -0,0 +1,190 @@
+import os
+from functools import lru_cache
+from itertools import combinations
+from math import comb
+from multiprocessing import Pool
+
+import numpy as np
+from treys.lookup import LookupTable
+
+from util import combos
+
+BOARD_SIZE = 5
+N_BOARDS = 2598960  # 52 choose 5
+EQUITY_PATH = 'equity.npz'
+
+# Positions of the 21 five card hands among the two hole cards followed by the board
+FIVE_OF_SEVEN = np.array(list(combinations(range(7), 5)), dtype=np.int64)
+
+
+@lru_cache(maxsize=None)
+def lookup_arrays():
+    """
+    The hash tables of the treys evaluator as sorted arrays so they can be searched in bulk
+    :return: (flush prime products, flush ranks, unsuited prime products, unsuited ranks)
+    """
+    table = LookupTable()
+    arrays = []
+    for lookup in (table.flush_lookup, table.unsuited_lookup):
+        keys = np.array(sorted(lookup), dtype=np.int64)
+        arrays += [keys, np.array([lookup[key] for key in keys.tolist()], dtype=np.int64)]
+    return tuple(arrays)
+
+
+def rank_hands(board):
+    """
+    Rank every combo on a board on the scale of treys.Evaluator, 1 is a royal flush
+    :param board: Five card indices into combos.deck()
+    :return: [1326] ranks, lower is stronger. Combos holding a board card get a meaningless rank.
+    """
+    flush_keys, flush_ranks, unsuited_keys, unsuited_ranks = lookup_arrays()
+    cards = np.concatenate((combos.combo_cards(),
+                            np.broadcast_to(combos.deck()[board], (combos.N_COMBOS, BOARD_SIZE))), axis=1)
+    hands = cards[:, FIVE_OF_SEVEN]  # [1326, 21, 5]
+
+    primes = np.prod(hands & 0xFF, axis=2)
+    flush = np.bitwise_and.reduce(hands, axis=2) & 0xF000 != 0
+    # Hands repeating a card are not in the tables, clip them onto any entry
+    flush_index = np.minimum(np.searchsorted(flush_keys, primes), len(flush_keys) - 1)
+    unsuited_index = np.minimum(np.searchsorted(unsuited_keys, primes), len(unsuited_keys) - 1)
+    ranks = np.where(flush, flush_ranks[flush_index], unsuited_ranks[unsuited_index])
+    return ranks.min(axis=1)
+
+
+def accumulate(boards, batch=1024):
+    """
+    Showdown results of every pair of combos over some boards
+    :param boards: Iterable of five card indices
+    :param batch: Boards whose combo masks are multiplied together at once
+    :return: [1326, 1326] wins of the row combo and boards dealt to both combos
+    """
+    masks = combos.card_masks()
+    wins = np.zeros((combos.N_COMBOS, combos.N_COMBOS), dtype=np.int32)
+    count = np.zeros((combos.N_COMBOS, combos.N_COMBOS))
+    dealt = []
+    for board in boards:
+        board = np.asarray(board)
+        ranks = rank_hands(board)
+        valid = ~masks[:, board].any(axis=1)
+        # A blocked row never wins and a blocked column never loses
+        wins += np.where(valid, ranks, LookupTable.MAX_HIGH_CARD + 1)[:, None] < np.where(valid, ranks, 0)[None, :]
+        dealt.append(valid)
+        if len(dealt) == batch:
+            dealt = np.array(dealt, dtype=np.float64)
+            count += dealt.T @ dealt
+            dealt = []
+    if dealt:
+        dealt = np.array(dealt, dtype=np.float64)
+        count += dealt.T @ dealt
+    return wins, count
+
+
+def enumeration_tasks(chunk):
+    """
+    Every board split into tasks of about chunk boards. Boards are grouped by their
+    three lowest cards, no group holds more than 1176 boards.
+    :return: List of tasks, each a list of the three lowest cards of its boards
+    """
+    tasks, task, size = [], [], 0
+    for prefix in combinations(range(combos.N_CARDS - BOARD_SIZE + 3), 3):
+        task.append(prefix)
+        size += comb(combos.N_CARDS - prefix[-1] - 1, BOARD_SIZE - 3)
+        if size >= chunk:
+            tasks.append(task)
+            task, size = [], 0
+    if task:
+        tasks.append(task)
+    return tasks
+
+
+def _enumerate_task(prefixes):
+    """
+    Every board starting with one of the prefixes, see enumeration_tasks
+    """
+    return accumulate(prefix + rest for prefix in prefixes
+                      for rest in combinations(range(prefix[-1] + 1, combos.N_CARDS), BOARD_SIZE - len(prefix)))
+
+
+def _sample_task(task):
+    """
+    Uniformly sampled boards
+    :param task: (seed, number of boards)
+    """
+    seed, n = task
+    keys = np.random.default_rng(seed).random((n, combos.N_CARDS))
+    return accumulate(np.argsort(keys, axis=1)[:, :BOARD_SIZE])
+
+
+def compute_equity(boards=None, workers=None, seed=0, chunk=1000):
+    """
+    All-in preflop equity of every combo against every other, spread over a process pool.
+    Enumerating all 2.6 million boards is an offline job of a few hours per core.
+    :param boards: Number of boards to sample, every board is enumerated if None
+    :param workers: Number of processes, defaults to the number of cores
+    :param seed: Seed of the sampled boards
+    :param chunk: Boards per task
+    :return: (equity, wins, count) where count is the number of boards seen by each pair.
+             Pairs sharing a card are counted as if they could be dealt together, their
+             entries are meaningless. combos.showdown_equity zeroes them.
+    """
+    if boards is None:
+        tasks, function = enumeration_tasks(chunk), _enumerate_task
+    else:
+        tasks = [(seed + i, min(chunk, boards - start)) for i, start in enumerate(range(0, boards, chunk))]
+        function = _sample_task
+
+    wins = np.zeros((combos.N_COMBOS, combos.N_COMBOS), dtype=np.int64)
+    count = np.zeros((combos.N_COMBOS, combos.N_COMBOS))
+    with Pool(workers) as pool:
+        for task_wins, task_count in pool.imap_unordered(function, tasks):
+            wins += task_wins
+            count += task_count
+    return equity_from_counts(wins, count), wins, count
+
+
+def equity_from_counts(wins, count):
+    """
+    :return: Probability of the row combo winning plus half the probability of a split
+    """
+    ties = count - wins - wins.T
+    return np.where(count > 0, (wins + 0.5 * ties) / np.maximum(count, 1), 0.0)
+
+
+def load_equity(path=EQUITY_PATH, **kwargs):
+    """
+    Read an equity matrix cached by a previous run, computing and caching it if there is none
+    :param kwargs: Arguments of compute_equity
+    :return: [1326, 1326] equity matrix
+    """
+    if os.path.exists(path):
+        with np.load(path) as cached:
+            return cached['equity']
+    equity, wins, count = compute_equity(**kwargs)
+    with open(path + '.tmp', 'wb') as stream:
+        np.savez(stream, equity=equity, wins=wins, count=count)
+    os.replace(path + '.tmp', path)
+    return equity
+
+
+def default_equity(path=EQUITY_PATH):
+    """
+    The exact equity matrix if a previous load_equity cached it, otherwise the rank
+    heuristic of combos.heuristic_equity. Never starts the offline computation.
+    :return: [1326, 1326] equity matrix
+    """
+    if os.path.exists(path):
+        return load_equity(path)
+    return combos.heuristic_equity()
+
+
+def class_equity(equity):
+    """
+    Equity of every preflop hand class against every other, averaged over the
+    combos of both classes that can be dealt together
+    :param equity: [1326, 1326] combo equity matrix
+    :return: [169, 169] class equity matrix
+    """
+    class_sum = combos.class_sums()
+    compatible = combos.compatibility()
+    pairs = class_sum @ compatible @ class_sum.T
+    return class_sum @ (equity * compatible) @ class_sum.T / pairs
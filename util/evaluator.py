@@ -0,0 +1,80 @@
+from functools import lru_cache
+from itertools import combinations, combinations_with_replacement
+
+import numpy as np
+from treys import Card
+from treys.lookup import LookupTable
+
+N_RANKS = 13
+N_SUITS = 4
+MAX_RANK = LookupTable.MAX_HIGH_CARD  # Weakest hand, 7-5-4-3-2 offsuit
+NO_FLUSH = MAX_RANK + 1
+
+PRIMES = np.array(Card.PRIMES, dtype=np.int64)
+POWERS = 5 ** np.arange(N_RANKS, dtype=np.int64)  # Each rank count is a base 5 digit of a rank key
+BITS = 1 << np.arange(N_RANKS, dtype=np.int64)
+SUIT_INDEX = np.zeros(9, dtype=np.int64)
+SUIT_INDEX[[1, 2, 4, 8]] = np.arange(N_SUITS)  # treys suit bit to suit index
+
+
+def best_of(ranks, lookup):
+    """
+    Strongest five card hand of every row of ranks according to a treys table
+    :param ranks: [m, n] ranks from 0 (deuce) to 12 (ace), n >= 5
+    :param lookup: treys dictionary from the prime product of five ranks to hand rank
+    """
+    keys = np.array(sorted(lookup), dtype=np.int64)
+    values = np.array([lookup[key] for key in keys.tolist()], dtype=np.int64)
+    subsets = np.array(list(combinations(range(ranks.shape[1]), 5)), dtype=np.int64)
+    primes = np.prod(PRIMES[ranks[:, subsets]], axis=2)
+    return values[np.searchsorted(keys, primes)].min(axis=1)
+
+
+@lru_cache(maxsize=None)
+def lookup_tables():
+    """
+    :return: (sorted rank keys, hand rank of each key ignoring suits,
+              [8192] flush rank of every set of suited ranks, NO_FLUSH below five cards)
+    """
+    table = LookupTable()
+    keys, values = [], []
+    for n in range(5, 8):
+        ranks = np.array([hand for hand in combinations_with_replacement(range(N_RANKS), n)
+                          if max(hand.count(rank) for rank in set(hand)) <= 4], dtype=np.int64)
+        keys.append(POWERS[ranks].sum(axis=1))
+        values.append(best_of(ranks, table.unsuited_lookup))
+    keys, values = np.concatenate(keys), np.concatenate(values)
+    order = np.argsort(keys)
+
+    flushes = np.full(1 << N_RANKS, NO_FLUSH, dtype=np.int64)
+    for n in range(5, 8):
+        suited = np.array(list(combinations(range(N_RANKS), n)), dtype=np.int64)
+        flushes[BITS[suited].sum(axis=1)] = best_of(suited, table.flush_lookup)
+    return keys[order], values[order], flushes
+
+
+def evaluate(ranks, suits):
+    """
+    Rank hands of five to seven cards on the scale of treys.Evaluator, 1 is a royal flush
+    :param ranks: [..., n] integer ranks from 0 (deuce) to 12 (ace)
+    :param suits: [..., n] integer suits from 0 to 3
+    :return: [...] hand ranks, lower is stronger
+    """
+    keys, values, flushes = lookup_tables()
+    ranks = np.asarray(ranks)
+    suits = np.asarray(suits)
+    best = values[np.searchsorted(keys, POWERS[ranks].sum(axis=-1))]
+    for suit in range(N_SUITS):
+        suited = np.where(suits == suit, BITS[ranks], 0).sum(axis=-1)
+        best = np.minimum(best, flushes[suited])
+    return best
+
+
+def evaluate_cards(cards):
+    """
+    evaluate for treys card integers
+    :param cards: [..., n] treys card integers, n from 5 to 7
+    :return: [...] hand ranks, lower is stronger
+    """
+    cards = np.asarray(cards, dtype=np.int64)
+    return evaluate((cards >> 8) & 0xF, SUIT_INDEX[(cards >> 12) & 0xF])
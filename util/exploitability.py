@@ -0,0 +1,131 @@
+import numpy as np
+from game.InfoSet import N_HAND_CLASSES
+from util.PublicTree import PublicTree
+from util import combos
+
+
+class PreflopBestResponse:
+    """
+    Best responses against the strategies stored in a GameWrapper, computed over the public
+    betting tree with a value for each of the 1326 hole card combinations. The best responder
+    picks one action per hand class, the information sets the strategies are defined on.
+    """
+    def __init__(self, wrapper, equity=None):
+        """
+        :param wrapper: GameWrapper holding the strategies, heads-up only
+        :param equity: [1326, 1326] showdown equity of the row combo against the column combo,
+                       defaults to the matrix of the wrapper
+        """
+        assert len(wrapper.players) == 2, "Best responses support heads-up play only"
+        self.wrapper = wrapper
+        self.tree = PublicTree.from_wrapper(wrapper)
+        self.showdown = combos.showdown_equity(wrapper.equity if equity is None else equity)
+        self.class_of = combos.combo_classes()
+        self.class_sum = combos.class_sums()
+
+    def policy(self, node, average=True):
+        """
+        :return: [1326, n] action probabilities of each combo at a decision node,
+                 uniform for information sets that were never created
+        """
+        n = len(node.actions)
+        policy = np.full((N_HAND_CLASSES, n), 1.0 / n)
+        table = self.wrapper.table
+        for cls in range(N_HAND_CLASSES):
+            key = self.wrapper.game.encoder.key(node.history_id, node.seat, cls)
+            if key in self.wrapper.game_states:
+                index = self.wrapper.game_states[key].index_
+                policy[cls] = table.average_strategy(index)[:n] if average else table.strategy[index, :n]
+        return policy[self.class_of]
+
+    def values(self, node, seat, reach, average=True):
+        """
+        :param seat: Seat of the best responder
+        :param reach: Probability of each opponent combo reaching the node
+        :return: Counterfactual value of each of the best responder's combos
+        """
+        if node.terminal:
+            return node.terminal_values([seat], [reach], self.showdown)[0]
+
+        if node.seat != seat:
+            policy = self.policy(node, average)
+            return sum(self.values(child, seat, reach * policy[:, i], average)
+                       for i, child in enumerate(node.children))
+
+        children = np.stack([self.values(child, seat, reach, average) for child in node.children], axis=1)
+        best = np.argmax(self.class_sum @ children, axis=1)
+        return children[np.arange(combos.N_COMBOS), best[self.class_of]]
+
+    def value(self, seat, average=True):
+        """
+        :return: Chips per hand won by a best response in the seat
+        """
+        return self.values(self.tree.root, seat, np.ones(combos.N_COMBOS), average).sum() / combos.N_DEALS
+
+    def exploitability(self, average=True):
+        """
+        :param average: Evaluate the average strategy, otherwise the current one
+        :return: Exploitability in milli big blinds per hand
+        """
+        chips = (self.value(0, average) + self.value(1, average)) / 2
+        return 1000 * chips / self.wrapper.game.big_blind
+
+
+def best_response_value(root, strategy, player):
+    """
+    Value of a best response on a game tree in the node interface of util.algorithms
+    :param root: Root node of the game
+    :param strategy: Map from information set to {action: probability}
+    :param player: Player best responding, 1 or -1 (util.algorithms.A)
+    :return: Expected payoff of the best responder
+    """
+    reaches = {}  # information set of the best responder -> [(node, opponent and chance reach)]
+
+    def collect(node, reach):
+        if node.is_terminal():
+            return
+        if node.is_chance():
+            for action in node.actions:
+                collect(node.play(action), reach * node.chance_prob())
+        elif node.to_move == player:
+            reaches.setdefault(node.inf_set(), []).append((node, reach))
+            for action in node.actions:
+                collect(node.play(action), reach)
+        else:
+            for action in node.actions:
+                collect(node.play(action), reach * strategy[node.inf_set()][action])
+
+    best_actions = {}
+    values = {}  # id(node) -> (node, value), the node is kept so its id cannot be reused
+
+    def best_action(information_set):
+        if information_set not in best_actions:
+            totals = {action: sum(reach * value(node.play(action)) for node, reach in reaches[information_set])
+                      for action in reaches[information_set][0][0].actions}
+            best_actions[information_set] = max(totals, key=totals.get)
+        return best_actions[information_set]
+
+    def value(node):
+        if id(node) in values:
+            return values[id(node)][1]
+        if node.is_terminal():
+            result = player * node.evaluation()
+        elif node.is_chance():
+            result = sum(node.chance_prob() * value(node.play(action)) for action in node.actions)
+        elif node.to_move == player:
+            result = value(node.play(best_action(node.inf_set())))
+        else:
+            result = sum(strategy[node.inf_set()][action] * value(node.play(action)) for action in node.actions)
+        values[id(node)] = (node, result)
+        return result
+
+    collect(root, 1.0)
+    return value(root)
+
+
+def exploitability(root, strategy, player=1):
+    """
+    Average gain of best responses against a strategy profile on a two player zero-sum tree
+    :param player: Identifier of the first player, util.algorithms.A
+    """
+    return (best_response_value(root, strategy, player) + best_response_value(root, strategy, -player)) / 2
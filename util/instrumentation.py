@@ -0,0 +1,101 @@
+import json
+import time
+from collections import defaultdict
+
+# Counters and timers of the hot paths of the engine, the equity estimates and CFR.
+# Everything is off by default, the disabled path is a global lookup and a return.
+enabled = False
+counters = defaultdict(int)
+seconds = defaultdict(float)
+calls = defaultdict(int)
+_dump = {'interval': None, 'callback': None, 'last': 0.0}
+
+
+class Timer:
+    """
+    Adds the time spent in a with block to a named timer
+    """
+    __slots__ = ['name', 'start']
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *args):
+        seconds[self.name] += time.perf_counter() - self.start
+        calls[self.name] += 1
+        if _dump['interval'] is not None:
+            maybe_dump()
+
+
+class NullTimer:
+    """
+    Timer used while instrumentation is disabled
+    """
+    __slots__ = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+
+NULL_TIMER = NullTimer()
+
+
+def enable(dump_interval=None, dump=None):
+    """
+    :param dump_interval: Seconds between dumps of the snapshot, never if None. Checked whenever a timer stops.
+    :param dump: Called with the snapshot, prints it as JSON by default
+    """
+    global enabled
+    enabled = True
+    _dump['interval'] = dump_interval
+    _dump['callback'] = dump if dump is not None else lambda snap: print(json.dumps(snap))
+    _dump['last'] = time.perf_counter()
+
+
+def disable():
+    global enabled
+    enabled = False
+    _dump['interval'] = None
+
+
+def reset():
+    counters.clear()
+    seconds.clear()
+    calls.clear()
+
+
+def count(name, n=1):
+    if enabled:
+        counters[name] += n
+
+
+def timer(name):
+    """
+    :return: Context manager timing its block under name
+    """
+    return Timer(name) if enabled else NULL_TIMER
+
+
+def snapshot():
+    """
+    :return: {'counters': {name: count}, 'timers': {name: {'calls', 'seconds'}}}
+    """
+    return {'counters': dict(counters),
+            'timers': {name: {'calls': calls[name], 'seconds': seconds[name]} for name in seconds}}
+
+
+def maybe_dump():
+    """
+    Pass the snapshot to the dump callback if dump_interval seconds have passed since the last dump
+    """
+    now = time.perf_counter()
+    if now - _dump['last'] >= _dump['interval']:
+        _dump['last'] = now
+        _dump['callback'](snapshot())
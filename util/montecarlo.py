@@ -1,20 +1,68 @@
 import time
+from collections import namedtuple
+from itertools import combinations
+from math import comb
 import numpy as np
+from util.evaluator import evaluate, MAX_RANK
+from util import instrumentation
+
+EXACT_THRESHOLD = 50000  # Largest number of outcomes that is enumerated instead of sampled
+CHUNK_SIZE = 8192  # Deals evaluated at once, bounds the memory of an evaluation
+
+# Estimated probability of winning, its standard error, the deals evaluated and 'exact' or 'sample'
+EquityEstimate = namedtuple('EquityEstimate', ['equity', 'stderr', 'samples', 'mode'])
+
+
+def sample_cards(deck, iterations, n):
+    """
+    Draw cards without replacement with a partial Fisher-Yates shuffle of every copy of the deck at once.
+    Only the n positions that are dealt get shuffled instead of the whole deck.
+    :param deck: Array of the cards left in the deck
+    :param iterations: Number of independent draws
+    :param n: Cards drawn per iteration
+    :return: [iterations, n] array of cards
+    """
+    decks = np.tile(deck, reps=(iterations, 1))
+    rows = np.arange(iterations)
+    for i in range(n):
+        swap = np.random.randint(i, len(deck), size=iterations)  # position swapped into slot i
+        drawn = decks[rows, swap]
+        decks[rows, swap] = decks[:, i]
+        decks[:, i] = drawn
+    return decks[:, :n]
+
+
+def count_outcomes(n_deck, board, opponents):
+    """
+    Number of distinct ways to finish the board and deal every opponent two cards
+    :param n_deck: Cards left in the deck
+    :param board: Board cards still to come
+    :param opponents: Number of opponents
+    """
+    outcomes = comb(n_deck, board)
+    for i in range(opponents):
+        outcomes *= comb(n_deck - board - 2 * i, 2)
+    return outcomes
+
+
+def enumerate_cards(deck, board, opponents):
+    """
+    Every way to finish the board and deal two cards to each opponent, in the layout of sample_cards
+    :return: [count_outcomes, board + 2 * opponents] array of cards
+    """
+    boards = list(combinations(range(len(deck)), board))
+    dealt = np.array(boards, dtype=np.int64).reshape(len(boards), board)
+    pairs = np.array(list(combinations(range(len(deck)), 2)), dtype=np.int64)
+    for _ in range(opponents):
+        used = np.zeros((len(dealt), len(deck)), dtype=bool)
+        used[np.arange(len(dealt))[:, None], dealt] = True
+        rows, pair = np.nonzero(~used[:, pairs[:, 0]] & ~used[:, pairs[:, 1]])
+        dealt = np.concatenate((dealt[rows], pairs[pair]), axis=1)
+    return deck[dealt]
 
 
-strided = np.lib.stride_tricks.as_strided
-
 class Evaluation(object):
-    def __init__(self):
-        self.highcard_multiplier = 1
-        self.pair_multiplier = 10 ** 2
-        self.twopair_multiplier = 10 ** 4
-        self.threeofakind_multiplier = 10 ** 6
-        self.straight_multiplier = 10 ** 8
-        self.flush_multiplier = 10 ** 10
-        self.fullhouse_multiplier = 10 ** 12
-        self.fourofakind_multiplier = 10 ** 14
-        self.straighflush_multiplier = 10 ** 18
+    exact_threshold = EXACT_THRESHOLD
 
     def card_to_num(self, card):
         suits_with_remainders = np.array([1, 2, 3])
@@ -34,66 +82,123 @@ class Evaluation(object):
         for i in range(0, len(tablecards)):
             tableCard = self.card_to_num(tablecards[i])
             tableCardList.append(tableCard)
-        self.tableCards = np.array(tableCardList)
+        self.tableCards = np.array(tableCardList, dtype=np.uint8)
         self.iterations = iterations
         self.player_amount = player_amount
 
-    def run_evaluation(self, card1, card2, tablecards, iterations, player_amount):
-        self.start = time.time()
+    def run_evaluation(self, card1, card2, tablecards, iterations, player_amount, exact_threshold=EXACT_THRESHOLD,
+                       chunk_size=CHUNK_SIZE):
+        """
+        Probability of holding the only best hand at showdown. When there are at most exact_threshold
+        ways to deal the remaining cards every one of them is evaluated instead of sampling.
+        The mode used and the number of deals evaluated are left in self.mode and self.samples.
+        :param card1: [rank, suit], ranks from 2 (deuce) to 14 (ace) and suits from 0 to 3
+        :param chunk_size: Deals evaluated at once, memory does not grow with iterations beyond it
+        """
+        instrumentation.count('evaluation.runs')
         self.set_args(card1, card2, tablecards, iterations, player_amount)
-        self.distribute_cards()
-        self.get_counts()
-        self.get_kickers()
-        self.get_multiplecards()
-        self.get_straightflush()
-        self.get_four_of_a_kind()
-        self.get_fullhouse()
-        self.get_flush(iterations, player_amount)
-        self.get_straight()
-        self.get_three_of_a_kind()
-        self.get_two_pair_score()
-        self.get_pair_score()
-        self.get_highcard()
-
-        wins = self.calc_score()
-
-        # print("Time Elapsed: " + str(time.time() - self.start))
-
-        return wins
-
-    def distribute_cards(self):
-        deck = np.arange(5, 57)  # 52 cards starting at 5 so that later code will make arrays starting at 2
+        self.exact_threshold = exact_threshold
+        self.chunk_size = chunk_size
+
+        wins = 0
+        chunks = self.draw_cards()
+        while True:
+            with instrumentation.timer('evaluation.draw_cards'):
+                shuffled = next(chunks, None)
+            if shuffled is None:
+                break
+            with instrumentation.timer('evaluation.distribute_cards'):
+                self.distribute_cards(shuffled)
+            with instrumentation.timer('evaluation.evaluate'):
+                self.hand_ranks = evaluate(np.moveaxis(self.cards, 1, -1) - 2, np.moveaxis(self.suits, 1, -1))
+            with instrumentation.timer('evaluation.calc_score'):
+                wins += self.calc_score()
+        instrumentation.count('evaluation.deals', self.samples)
+
+        return wins / self.samples
+
+    def run_adaptive(self, card1, card2, tablecards, player_amount, thresholds=(), batch=250, max_samples=10000,
+                     time_budget=None, z=2.58, exact_threshold=EXACT_THRESHOLD):
+        """
+        Sample in batches until the confidence interval of the win rate excludes every threshold,
+        so clear decisions stop after a few hundred deals
+        :param thresholds: Equities the caller's decision depends on. Without any, sampling
+                           runs until max_samples or time_budget is reached.
+        :param batch: Deals sampled between checks
+        :param max_samples: Deals after which sampling stops regardless
+        :param time_budget: Seconds after which sampling stops regardless
+        :param z: Half width of the confidence interval in standard errors
+        :return: EquityEstimate
+        """
+        start = time.time()
+        thresholds = tuple(thresholds or ())
+        wins = self.run_evaluation(card1, card2, tablecards, min(batch, max_samples), player_amount, exact_threshold)
+        if self.mode == 'exact':
+            return EquityEstimate(float(wins), 0.0, self.samples, self.mode)
+
+        wins, samples = wins * self.samples, self.samples
+        while True:
+            equity = wins / samples
+            # Shrunk towards 1/2 so a batch of only wins or only losses still has an error
+            shrunk = (wins + 0.5) / (samples + 1)
+            stderr = np.sqrt(shrunk * (1 - shrunk) / samples)
+            if samples >= max_samples or (time_budget is not None and time.time() - start >= time_budget) \
+                    or (thresholds and all(abs(equity - threshold) > z * stderr for threshold in thresholds)):
+                return EquityEstimate(float(equity), float(stderr), samples, 'sample')
+
+            iterations = min(batch, max_samples - samples)
+            wins += self.run_evaluation(card1, card2, tablecards, iterations, player_amount, -1) * iterations
+            samples += iterations
+
+    def draw_cards(self):
+        """
+        Cards drawn from the deck in chunks of at most self.chunk_size deals, each chunk holds
+        the rest of the board followed by two cards for each opponent
+        """
+        deck = np.arange(5, 57, dtype=np.uint8)  # 52 cards starting at 5 so that later code will make arrays starting at 2
         mycards = np.array([self.card1, self.card2])
         mask = np.isin(deck, mycards, invert=True)
         deck = deck[mask]  # deletes my cards out of deck
         mask = np.isin(deck, self.tableCards, invert=True)
         deck = deck[mask]  # deletes set tableCards out of deck
-        mycards = np.array([self.card1, self.card2])
-        mycards = np.append(mycards, self.tableCards)  # [My first card, My second card, TableCards]
 
-        # shuffles the deck
-        alldecks = np.tile(deck, reps=(self.iterations, 1))  # creates copies of decks  = number of games
-        temp_random = np.random.random(alldecks.shape)  # create random number arrays that are the size of "alldecks"
-        idx = np.argsort(temp_random, axis=-1)  # creates ranking of random numbers Highest to Lowest
-        shuffled = alldecks[np.arange(alldecks.shape[0])[:, None], idx]  # organizes deck according to random ranking
+        board_cards_to_draw = 5 - len(self.tableCards)  # rest of the board, shared by every player
+        if count_outcomes(len(deck), board_cards_to_draw, self.player_amount - 1) <= self.exact_threshold:
+            self.mode = 'exact'
+            outcomes = enumerate_cards(deck, board_cards_to_draw, self.player_amount - 1)
+            self.samples = len(outcomes)
+            for start in range(0, self.samples, self.chunk_size):
+                yield outcomes[start:start + self.chunk_size]
+        else:
+            self.mode = 'sample'
+            self.samples = self.iterations
+            for start in range(0, self.samples, self.chunk_size):
+                yield sample_cards(deck, min(self.chunk_size, self.samples - start),
+                                   board_cards_to_draw + 2 * (self.player_amount - 1))
+
+    def distribute_cards(self, shuffled):
+        """
+        Seven cards of every player for a chunk of deals
+        :param shuffled: Chunk of draw_cards
+        """
+        mycards = np.array([self.card1, self.card2], dtype=np.uint8)
+        mycards = np.append(mycards, self.tableCards)  # [My first card, My second card, TableCards]
 
         cards_at_end_of_game = 7  # each player will have 7 cards in their array
-        shuffled_cards_to_append = cards_at_end_of_game - len(
-            self.tableCards)  # 7 total cards minus ones set to be on the table
+        board_cards_to_draw = 5 - len(self.tableCards)  # rest of the board, shared by every player
 
         # makes opponent's cards for all games lookup table - later to be turned into numpy array
         cards_player = {}
         for i in range(0, self.player_amount - 1):
-            startingOppsCard = shuffled_cards_to_append + (i * 2)
+            startingOppsCard = board_cards_to_draw + (i * 2)
             endingOppsCard = startingOppsCard + 2
             cards_player[i] = shuffled[:,
                               startingOppsCard:endingOppsCard]  # first bit of random cards are set aside for random draws
-            np.delete(shuffled, shuffled[:, startingOppsCard:endingOppsCard])
             if len(self.tableCards) != 0:
                 cards_player[i] = np.insert(cards_player[i], 2, self.tableCards[:, None],
                                             axis=1)  # puts set tablecards into players 7 cards
 
-        cards_combined_mine = np.append(np.tile(mycards, reps=(self.iterations, 1)), shuffled, axis=1)[:,
+        cards_combined_mine = np.append(np.tile(mycards, reps=(len(shuffled), 1)), shuffled, axis=1)[:,
                               0:cards_at_end_of_game]  # repeats my cards iterations of time to match opponents random iteration arrays
         cards_combined_array = [cards_combined_mine]  # create cards list that starts with my cards
 
@@ -102,185 +207,86 @@ class Evaluation(object):
             cards_combined_array.append(np.append(cards_player[i], shuffled, axis=1)[:, 0:cards_at_end_of_game])
 
         cards_combined = np.stack(cards_combined_array, axis=-1)  # stack over last axis (=axis 3)
-        cards = np.ceil(cards_combined / 4)
-        suits = cards_combined % 4 * 1
-        self.decks = np.stack((cards, suits), axis=2)  # [iterations, 7, card or suits, player_index]
-        self.cards = self.decks[:, :, 0, :]  # [iterations, 7, player_index]
-        self.suits = self.decks[:, :, 1, :]  # [iterations, 7, player_index]
-        self.cards_sorted = np.sort(self.cards, axis=1)[:, ::-1, :]
-
-
-
-    def get_counts(self):
-        # Counts = [iteration,player,card]
-        self.counts = (np.arange(13, 0, -1) == self.cards[:, :, :, None]).sum(1)  # occurrences of each cards
-        self.highestCard = self.cards_sorted[:, 0, :]  # iterations, cards_sorted, player
-
-    def get_kickers(self):
-        self.cards13to1 = np.arange(13, 0, -1) * -1  # A = 13 2 = 1
-
-        # [iteration, player]
-        # get bool of where counts ==2, multiply by value, sort, invert, get highest pair, second highest, third highest
-        self.pair1 = np.sort((self.counts == 2) * self.cards13to1 * -1, axis=2)[:, :, ::-1][:, :, 0]
-        self.pair2 = np.sort((self.counts == 2) * self.cards13to1 * -1, axis=2)[:, :, ::-1][:, :, 1]
-        self.pair3 = np.sort((self.counts == 2) * self.cards13to1 * -1, axis=2)[:, :, ::-1][:, :, 2]
-
-        self.three1 = np.sort((self.counts == 3) * self.cards13to1 * -1, axis=2)[:, :, ::-1][:, :, 0]
-        self.three2 = np.sort((self.counts == 3) * self.cards13to1 * -1, axis=2)[:, :, ::-1][:, :, 1]
-
-        self.four1 = np.sort((self.counts == 4) * self.cards13to1 * -1, axis=2)[:, :, ::-1][:, :, 0]
-
-        self.single1 = np.sort((self.counts == 1) * self.cards13to1 * -1, axis=2)[:, :, ::-1][:, :, 0]
-        self.single2 = np.sort((self.counts == 1) * self.cards13to1 * -1, axis=2)[:, :, ::-1][:, :, 1]
-        self.single3 = np.sort((self.counts == 1) * self.cards13to1 * -1, axis=2)[:, :, ::-1][:, :, 2]
-        self.single4 = np.sort((self.counts == 1) * self.cards13to1 * -1, axis=2)[:, :, ::-1][:, :, 3]
-        self.single5 = np.sort((self.counts == 1) * self.cards13to1 * -1, axis=2)[:, :, ::-1][:, :, 4]
-        self.single = np.sort((self.counts == 1) * self.cards13to1 * -1, axis=2)[:, :, ::-1][:, :, :]
-
-    def get_multiplecards(self):
-
-        self.pair_amount = (self.counts == 2).sum(2)
-        self.threeofakind_amount = (self.counts == 3).sum(2)
-        self.fourofakind_amount = (self.counts == 4).sum(2)
-
-        self.pair = (self.pair_amount == 1)
-        self.twopair = (self.pair_amount >= 2)
-        self.singletwopair = (self.pair_amount == 2)
-        self.threepair = (self.pair_amount == 3)  # same as twopair but different treatment of kickers
-        self.threeofakind = (self.threeofakind_amount == 1)
-        self.fourofakind = (self.fourofakind_amount == 1)
-
-    def get_straightflush(self):
-        # first dimension is the suit type, second the montecarlo, third the card, and fourth the player
-        cards_stacked_suits = (self.suits == np.arange(4)[:, None, None, None]) * 1 * self.cards
-        cards_stacked_suits = np.sort(cards_stacked_suits * -1, axis=2) * -1
-        add_low = cards_stacked_suits[:, :, 0, :] - 13  # add highest card - 12 for ace low straight
-        cards_stacked_suits = np.append(cards_stacked_suits, add_low[:, :, None, :], axis=2)
-
-        stri = cards_stacked_suits.strides
-        shpe = cards_stacked_suits.shape
-
-        # new array 1. 4 checks, 4 different suits, shpe[1] runs, 5 cards down, she[3] players
-        cards_stacked_suits_straightvariants = strided(cards_stacked_suits, shape=(4, 4, shpe[1], 5, shpe[3]),
-                                                       strides=(stri[2], stri[0], stri[1], stri[2], stri[3]))
-
-        cards_stacked_suits_straightvariants_highest_card = cards_stacked_suits_straightvariants[..., 0, :]
-        highest_straightflush_cards = np.sum(cards_stacked_suits_straightvariants_highest_card, axis=0)
-
-        straight_flushes_by_suit_and_variant = np.all(np.diff(cards_stacked_suits_straightvariants, axis=3) == -1,
-                                                      axis=3)
-        straightflush_by_suit = np.any(straight_flushes_by_suit_and_variant, axis=0)
-        self.straightflush_score = np.sum(highest_straightflush_cards * straightflush_by_suit, axis=0)
-        self.straightflush = np.any(straightflush_by_suit, axis=0)
-
-    def get_four_of_a_kind(self):
-        four_of_a_kind_multi = 100
-        kicker_multi = 1
-        self.fourofakindScore = self.four1 * four_of_a_kind_multi + self.single1 * kicker_multi
-        self.fourofakindScore = self.fourofakindScore / four_of_a_kind_multi
-
-    def get_fullhouse(self):
-        fullHouseMulti = 100
-        self.fullhouse = np.logical_or(self.threeofakind_amount == 2,
-                                       np.logical_and(self.threeofakind_amount == 1, self.pair_amount >= 1))
-
-        self.fullhouse_kicker1 = np.sort((self.counts == 3) * np.arange(13, 0, -1), axis=2)[:, :, ::-1][:, :, 0]
-
-        highest_pair = np.sort((self.counts == 2) * np.arange(13, 0, -1), axis=2)[:, :, ::-1][:, :, 0]
-
-        second_threeofakind = np.sort((self.counts == 3) * np.arange(13, 0, -1), axis=2)[:, :, ::-1][:, :, 1]
-
-        self.fullhouse_kicker2 = np.amax(np.stack((highest_pair, second_threeofakind), axis=1), axis=1)
-
-        self.fullhouseScore = self.fullhouse * (self.fullhouse_kicker1 * fullHouseMulti + self.fullhouse_kicker2)
-        self.fullhouseScore = self.fullhouseScore / fullHouseMulti
-
-    def get_flush(self, iterations, player_amount):
-        self.suitCounts = (self.suits[:, :, :, None] == np.arange(0, 4)).sum(1)  # occurrences of each suit
-        self.maxsuit = np.argmax(self.suitCounts, axis=2)
-        self.flush = self.suitCounts[np.arange(iterations)[:, None], np.arange(player_amount), self.maxsuit] >= 5
-        self.flushcards = self.suits == self.maxsuit[:, None]
-        self.sorted_flushcards = (np.sort(self.flushcards * self.cards * -1, axis=1) * -1)
-        self.sorted_5flushcards = np.delete(self.sorted_flushcards, [5, 6], axis=1)
-        multiplier = np.array([10 ** 8, 10 ** 6, 10 ** 4, 10 ** 2, 1])
-        self.flushScore = (self.sorted_5flushcards * multiplier[..., :, None]).sum(1)
-        self.flushScore = self.flushScore / np.sum(multiplier[:])
-
-    def get_straight(self):
-        add_low = self.cards_sorted[:, 0, :] - 13
-        straight_cards = np.append(self.cards_sorted, add_low[:, None, :], axis=1)
-
-        stri = straight_cards.strides
-        shpe = straight_cards.shape
-
-        cards_stacked_straightvariants = strided(straight_cards, shape=(4, shpe[0], 5, shpe[2]),
-                                                 strides=(stri[1], stri[0], stri[1], stri[2]))
-
-        cards_stacked_straightvariants_highest_card = cards_stacked_straightvariants[..., 0, :]
-        straights_variants = np.all(np.diff(cards_stacked_straightvariants, axis=2) == -1, axis=2)
-        self.straight = np.any(straights_variants, axis=0)
-        self.straightScore = np.sum(cards_stacked_straightvariants_highest_card * straights_variants, axis=0)
-
-    def get_three_of_a_kind(self):
-        threepairscore_mult = 10
-        kickerMulti = 1
-        self.threeScore = (self.three1 * threepairscore_mult) + (self.single1 + self.single2) * kickerMulti
-        self.threeScore = self.threeScore / threepairscore_mult
-
-    def get_two_pair_score(self):
-        firstTwoPairScoreMulti = 1000
-        secondTwoPairScoreMulti = 10
-        kickerMulti = 1
-        self.twoPairScore = (self.pair1 * firstTwoPairScoreMulti) + (self.pair2 * secondTwoPairScoreMulti) + (
-                self.single1 * kickerMulti)
-        self.twoPairScore = self.twoPairScore / firstTwoPairScoreMulti
-
-    def get_pair_score(self):
-        PairScoreMulti = 100
-        kickerMulti = 1
-        self.pairScore = (self.pair1 * PairScoreMulti) + (self.single1 + self.single2 + self.single3) * kickerMulti
-        self.pairScore = self.pairScore / PairScoreMulti
-
-    def get_highcard(self):
-        HighCard1Val = 10 ** 8
-        HighCard2Val = 10 ** 6
-        HighCard3Val = 10 ** 4
-        HighCard4Val = 10 ** 2
-        HighCard5Val = 1
-        HighCardVals = np.array([HighCard1Val, HighCard2Val, HighCard3Val, HighCard4Val, HighCard5Val])
-
-        self.highcard = np.all(np.stack((
-            self.pair_amount == 0, self.threeofakind == False, self.fourofakind_amount == 0,
-            self.straight == False, self.flush == False), axis=0), axis=0)
-
-        cards13to1 = np.arange(13, 0, -1) * -1
-        HighCards = np.sort((self.counts == 1) * cards13to1 * -1, axis=2)[:, :, ::-1][:, :, :5]
-        highCardsVal = HighCards * HighCardVals
-        highCardsVal = highCardsVal.sum(2)
-        self.highCardsVal = highCardsVal / np.sum(HighCardVals)
+        self.cards = (cards_combined + 3) // 4  # [iterations, 7, player_index], 2 to 14
+        self.suits = cards_combined % 4  # [iterations, 7, player_index]
 
     def calc_score(self):
-        self.cardtype_multiplier = np.array(
-            [self.highcard_multiplier, self.pair_multiplier, self.twopair_multiplier, self.threeofakind_multiplier,
-             self.straight_multiplier, self.flush_multiplier, self.fullhouse_multiplier, self.fourofakind_multiplier,
-             self.straighflush_multiplier])
-        self.detected_types = np.stack((self.highcard, self.pair, self.twopair, self.threeofakind, self.straight,
-                                        self.flush, self.fullhouse, self.fourofakind, self.straightflush), axis=0)
-        self.hand_vals = np.stack((
-            self.highCardsVal, self.pairScore, self.twoPairScore, self.threeScore, self.straightScore, self.flushScore,
-            self.fullhouseScore, self.fourofakindScore, self.straightflush_score), axis=0)
-
-        detected_types = self.detected_types * 1
-        self.active_multiplier = self.cardtype_multiplier[:, None, None] * detected_types * self.hand_vals
-        self.ordered_multiplier = np.sort(self.active_multiplier, axis=0)[::-1, :, :]
-        highestVals = np.argmax(self.ordered_multiplier[0, :, :], axis=1)
-        Winners = (self.ordered_multiplier[0, ::] == np.amax(self.ordered_multiplier[0, :, :], axis=1)[:, None])
-        MyWinnerMask = np.zeros(self.player_amount, dtype=int)
-        MyWinnerMask[0] = 1
-        MyWinnArray = (Winners == MyWinnerMask).all(1)
+        # [iteration, player] hand ranks of treys, lower is stronger
+        Winners = self.hand_ranks == self.hand_ranks.min(axis=1)[:, None]
+        MyWinnArray = Winners[:, 0] & (Winners.sum(axis=1) == 1)
         MyWins = np.sum(MyWinnArray, axis=0)
 
-        return MyWins / self.iterations
+        return MyWins
+
+
+def batch_equity(holes, boards, opponents, iterations=1000, chunk_size=CHUNK_SIZE):
+    """
+    Equity of many spots in one vectorised pass, each sampled like Evaluation.run_evaluation
+    :param holes: [Q, 2, 2] hole cards as [rank, suit], ranks from 2 (deuce) to 14 (ace) and suits from 0 to 3
+    :param boards: Q boards of 0 to 5 cards as [rank, suit]
+    :param opponents: [Q] number of opponents of each spot
+    :param iterations: Deals sampled per spot
+    :param chunk_size: Deals evaluated at once, spots are processed in groups that fit
+                       and the iterations of a spot are split when they alone exceed it
+    :return: [Q] probabilities of holding the only best hand at showdown
+    """
+    holes = np.asarray(holes, dtype=np.int64).reshape(-1, 2, 2)
+    opponents = np.asarray(opponents, dtype=np.int64)
+    lengths = np.array([len(board) for board in boards], dtype=np.int64)
+    known = np.zeros((len(boards), 5), dtype=np.int64)
+    for q, board in enumerate(boards):
+        if len(board):
+            known[q, :len(board)] = np.asarray(board, dtype=np.int64).reshape(-1, 2) @ [4, 1] - 8
+    holes = holes @ [4, 1] - 8  # Card indices, rank * 4 + suit with ranks from 0
+
+    wins = np.zeros(len(holes))
+    step = max(1, chunk_size // iterations)
+    deals = min(iterations, chunk_size)
+    for start in range(0, len(holes), step):
+        spots = slice(start, start + step)
+        for done in range(0, iterations, deals):
+            wins[spots] += _batch_wins(holes[spots], known[spots], lengths[spots], opponents[spots],
+                                       min(deals, iterations - done))
+    return wins / iterations
+
+
+def _batch_wins(holes, known, lengths, opponents, iterations):
+    """
+    Wins of a group of spots, see batch_equity. Each spot's deck holds the cards left
+    first, the draws are a partial Fisher-Yates shuffle of that prefix.
+    """
+    n, seats = len(holes), opponents.max()
+    dealt = np.zeros((n, 52), dtype=bool)
+    dealt[np.arange(n)[:, None], holes] = True
+    dealt[np.arange(n)[:, None], np.where(np.arange(5) < lengths[:, None], known, holes[:, :1])] = True
+    left = (52 - dealt.sum(axis=1))[:, None]
+    decks = np.tile(np.argsort(dealt, axis=1, kind='stable').astype(np.uint8)[:, None, :], (1, iterations, 1))
+    decks = decks.reshape(n * iterations, 52)
+
+    rows = np.arange(n * iterations)
+    needed = (5 - lengths.min()) + 2 * seats
+    for i in range(needed):
+        swap = i + (np.random.random((n, iterations)) * (left - i)).astype(np.int64).ravel()
+        drawn = decks[rows, swap]
+        decks[rows, swap] = decks[:, i]
+        decks[:, i] = drawn
+    drawn = decks[:, :needed].reshape(n, iterations, needed).astype(np.int64)
+    del decks
+
+    # The board is the known cards followed by the first draws, each opponent takes the next two
+    position = np.broadcast_to((np.arange(5) - lengths[:, None])[:, None, :], (n, iterations, 5))
+    board = np.where(position < 0, known[:, None, :], np.take_along_axis(drawn, np.maximum(position, 0), axis=2))
+    first = (5 - lengths)[:, None] + np.arange(2 * seats)
+    opponent_cards = np.take_along_axis(drawn, np.broadcast_to(first[:, None, :], (n, iterations, 2 * seats)),
+                                        axis=2).reshape(n, iterations, seats, 2)
+    del drawn
+
+    hands = np.concatenate((np.broadcast_to(holes[:, None, None, :], (n, iterations, 1, 2)), opponent_cards),
+                           axis=2)
+    hands = np.concatenate((hands, np.broadcast_to(board[:, :, None, :], (n, iterations, seats + 1, 5))), axis=3)
+    ranks = evaluate(hands // 4, hands % 4)  # [n, iterations, seats + 1]
+    others = np.where(np.arange(seats) < opponents[:, None, None], ranks[:, :, 1:], MAX_RANK + 1)  # Empty seats never win
+    return (ranks[:, :, 0] < others.min(axis=2)).sum(axis=1)
 
 
 def numpy_montecarlo(my_cards, table_cards_alpha_numeric, iterations, player_amount):
@@ -288,12 +294,12 @@ def numpy_montecarlo(my_cards, table_cards_alpha_numeric, iterations, player_amo
     E = Evaluation()
     CARD_RANKS_ORIGINAL = '23456789TJQKA'
     SUITS_ORIGINAL = 'CDHS'
-    card1 = [CARD_RANKS_ORIGINAL.find(my_cards[0][0][0]), SUITS_ORIGINAL.find(my_cards[0][0][1])]
-    card2 = [CARD_RANKS_ORIGINAL.find(my_cards[0][1][0]), SUITS_ORIGINAL.find(my_cards[0][1][1])]
+    card1 = [CARD_RANKS_ORIGINAL.find(my_cards[0][0][0]) + 2, SUITS_ORIGINAL.find(my_cards[0][0][1])]
+    card2 = [CARD_RANKS_ORIGINAL.find(my_cards[0][1][0]) + 2, SUITS_ORIGINAL.find(my_cards[0][1][1])]
 
     table_cards_numeric = []
     for table_card in table_cards_alpha_numeric[2:]:
-        table_cards_numeric.append([CARD_RANKS_ORIGINAL.find(table_card[0]), SUITS_ORIGINAL.find(table_card[1])])
+        table_cards_numeric.append([CARD_RANKS_ORIGINAL.find(table_card[0]) + 2, SUITS_ORIGINAL.find(table_card[1])])
 
     equity = E.run_evaluation(card1=card1, card2=card2, tablecards=table_cards_numeric, iterations=iterations,
                               player_amount=player_amount)
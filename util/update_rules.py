@@ -0,0 +1,74 @@
+class DiscountedCFR:
+    """
+    Discounting applied to the cumulative regrets and strategies after each iteration
+    (Brown & Sandholm, Solving Imperfect-Information Games via Discounted Regret Minimization).
+    After iteration t positive regrets are scaled by t^a / (t^a + 1), negative regrets by
+    t^b / (t^b + 1) and the strategy sum by (t / (t + 1))^g.
+    """
+    def __init__(self, alpha=1.5, beta=0.0, gamma=2.0):
+        self.alpha = alpha
+        self.beta = beta
+        self.gamma = gamma
+
+    def discounts(self, t):
+        """
+        :param t: Number of iterations completed, starting at 1
+        :return: Factors for positive regrets, negative regrets and the strategy sum
+        """
+        return _ratio(t, self.alpha), _ratio(t, self.beta), (t / (t + 1)) ** self.gamma
+
+    def is_vanilla(self):
+        return self.discounts(1) == (1.0, 1.0, 1.0)
+
+
+class RegretMatching(DiscountedCFR):
+    """
+    Plain regret matching with uniform averaging
+    """
+    def __init__(self):
+        super().__init__(alpha=float('inf'), beta=float('inf'), gamma=0.0)
+
+
+class LinearCFR(DiscountedCFR):
+    """
+    Weights iteration t by t in both the regrets and the average strategy
+    """
+    def __init__(self):
+        super().__init__(alpha=1.0, beta=1.0, gamma=1.0)
+
+
+class CFRPlus(DiscountedCFR):
+    """
+    Floors cumulative regrets at zero and averages strategies linearly.
+    On chance sampled deals the floor amplifies the sampling noise in the regrets
+    and it converges slower than vanilla CFR.
+    """
+    def __init__(self):
+        super().__init__(alpha=float('inf'), beta=-float('inf'), gamma=1.0)
+
+
+UPDATE_RULES = {
+    'vanilla': RegretMatching,
+    'cfr+': CFRPlus,
+    'linear': LinearCFR,
+    'dcfr': DiscountedCFR,
+}
+
+
+def get_update_rule(rule):
+    """
+    :param rule: Name in UPDATE_RULES, a DiscountedCFR instance or None for vanilla
+    """
+    if rule is None:
+        return RegretMatching()
+    if isinstance(rule, str):
+        return UPDATE_RULES[rule]()
+    return rule
+
+
+def _ratio(t, exponent):
+    if exponent == float('inf'):
+        return 1.0
+    if exponent == -float('inf'):
+        return 0.0
+    return t ** exponent / (t ** exponent + 1)